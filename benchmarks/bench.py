@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import polars as pl
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+from periods.generator import Generator
+from periods.distribution import YearlyDistribution, MonthlyDistribution, DailyDistribution, HourlyDistribution
+from order_generator import OrderDistributionGenerator
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLOTTING_MODULES = ('matplotlib', 'seaborn')
+STARTUP_SCRIPT = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "import order_generator\n"
+    "seconds = time.perf_counter() - started\n"
+    f"print(seconds, ','.join(sorted({{name.split('.')[0] for name in sys.modules}} & set({PLOTTING_MODULES!r}))))\n"
+)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+GRIDS = {
+    'quick': {'spans': ['1M', '1Y'], 'orders': [10**3, 10**5], 'catalogs': [24, 1_000]},
+    'default': {'spans': ['1M', '1Y', '5Y'], 'orders': [10**3, 10**5, 10**6], 'catalogs': [24, 10_000]},
+    'full': {'spans': ['1M', '1Y', '5Y', '20Y'], 'orders': [10**3, 10**4, 10**5, 10**6, 10**7, 10**8], 'catalogs': [24, 10_000, 1_000_000]},
+}
+SPAN_YEARS = {'1M': 0, '1Y': 1, '5Y': 5, '20Y': 20}
+DISTRIBUTION_LEVELS = ('yearly', 'monthly', 'daily', 'hourly')
+
+MONTH_PROBABILITIES = [0.06, 0.06, 0.07, 0.08, 0.09, 0.09, 0.1, 0.1, 0.09, 0.08, 0.09, 0.09]
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 1, 3, 5, 6, 6, 6, 6, 7, 6, 6, 6, 6, 7, 7, 6, 5, 4, 3, 2]
+HOUR_PROBABILITIES = [weight / sum(HOUR_WEIGHTS) for weight in HOUR_WEIGHTS]
+DAY_OF_WEEK_FACTOR = [0.9, 0.95, 1.0, 1.0, 1.1, 1.2, 0.85]
+
+def span_dates(span: str) -> Tuple[datetime, datetime]:
+    years = SPAN_YEARS[span]
+    if years == 0:
+        return datetime(2024, 1, 1), datetime(2024, 1, 31)
+    return datetime(2024, 1, 1), datetime(2024 + years - 1, 12, 31)
+
+def catalog(size: int) -> pl.DataFrame:
+    rng = np.random.default_rng(size)
+    return pl.DataFrame({
+        "item_name": [f"item-{i}" for i in range(size)],
+        "item_price": np.round(rng.uniform(5, 500, size), 2),
+        "item_popularity": rng.pareto(1.5, size) + 1,
+    })
+
+def run_case(case: str, span: str, total_orders: int, catalog_size: int) -> Dict[str, float]:
+    start_date, end_date = span_dates(span)
+    items = catalog(catalog_size) if case == 'create_orders_df' else None
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    started = time.perf_counter()
+    if case == 'generator':
+        generator = Generator(start_date, end_date, total_orders)
+        generator.hour
+    elif case == 'yearly':
+        YearlyDistribution(start_date, end_date, total_orders, noise_std_dev=0.05).generate_years()
+    elif case == 'monthly':
+        MonthlyDistribution(start_date, end_date, total_orders, MONTH_PROBABILITIES, noise_std_dev=0.05).generate_months()
+    elif case == 'daily':
+        DailyDistribution(start_date, end_date, total_orders, MONTH_PROBABILITIES, DAY_OF_WEEK_FACTOR, noise_std_dev=0.05).generate_days()
+    elif case == 'hourly':
+        HourlyDistribution(start_date, end_date, total_orders, MONTH_PROBABILITIES, HOUR_PROBABILITIES, DAY_OF_WEEK_FACTOR, noise_std_dev=0.05).generate_hours()
+    elif case == 'create_orders_df':
+        generator = OrderDistributionGenerator(start_date, end_date, total_orders, MONTH_PROBABILITIES, DAY_OF_WEEK_FACTOR,
+                                               hour_probabilities=HOUR_PROBABILITIES, noise_std_dev=0.05, seed=0)
+        generator.create_orders_df('hour', items, 'item_name', 'item_price', 'item_popularity', True, 0.7)
+    else:
+        raise ValueError(f"Unknown benchmark case {case}.")
+    seconds = time.perf_counter() - started
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss
+    return {'seconds': seconds, 'peak_mb': peak_kb * (1 if sys.platform == 'darwin' else 1024) / 2**20}
+
+def build_cases(grid: str, max_orders: Optional[int]) -> List[Tuple[str, str, int, int]]:
+    spans, orders, catalogs = GRIDS[grid]['spans'], GRIDS[grid]['orders'], GRIDS[grid]['catalogs']
+    orders = [count for count in orders if max_orders is None or count <= max_orders]
+
+    cases = [('generator', span, orders[0], 0) for span in spans]
+    cases += [(level, span, orders[-1], 0) for level in DISTRIBUTION_LEVELS for span in spans]
+    cases += [('create_orders_df', span, count, size) for span in spans for count in orders for size in catalogs]
+    return cases
+
+def case_name(case: str, span: str, total_orders: int, catalog_size: int) -> str:
+    name = f"{case}[span={span},orders={total_orders}"
+    return name + (f",catalog={catalog_size}]" if catalog_size else "]")
+
+def measure(cases: List[Tuple[str, str, int, int]], repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    # a fresh interpreter per run keeps peak memory and cached imports from leaking between cases
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn'), max_tasks_per_child=1) as executor:
+        for case in cases:
+            runs = [executor.submit(run_case, *case).result() for _ in range(repeat)]
+            name = case_name(*case)
+            results[name] = {'seconds': min(run['seconds'] for run in runs), 'peak_mb': max(run['peak_mb'] for run in runs)}
+            print(f"{name:<70} {results[name]['seconds']:>9.3f}s {results[name]['peak_mb']:>9.1f}MB", flush=True)
+    return results
+
+def measure_startup(repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=REPO_ROOT, 
+                                capture_output=True, text=True, check=True).stdout.split(" ")
+        if output[1].strip():
+            raise RuntimeError(f"Importing order_generator loaded the plotting stack: {output[1].strip()}.")
+        runs.append(float(output[0]))
+    return min(runs)
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float, memory_threshold: float, min_seconds: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        if result['seconds'] > expected['seconds'] * (1 + threshold) + min_seconds:
+            regressions.append(f"{name}: {result['seconds']:.3f}s vs baseline {expected['seconds']:.3f}s")
+        if result['peak_mb'] > expected['peak_mb'] * (1 + memory_threshold) + 1.0:
+            regressions.append(f"{name}: {result['peak_mb']:.1f}MB vs baseline {expected['peak_mb']:.1f}MB")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Wall time and peak memory benchmarks for the order generator.")
+    parser.add_argument("--grid", choices=list(GRIDS), default='default')
+    parser.add_argument("--max-orders", type=int, default=None, help="skip grid points above this order count")
+    parser.add_argument("--filter", default=None, help="only run cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action='store_true', help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--memory-threshold", type=float, default=0.25, help="allowed relative peak memory growth")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="absolute slack added to every time threshold")
+    parser.add_argument("--startup-budget", type=float, default=1.0, help="maximum seconds to import order_generator")
+    args = parser.parse_args(argv)
+
+    startup = measure_startup(args.repeat)
+    print(f"{'import[order_generator]':<70} {startup:>9.3f}s", flush=True)
+    if startup > args.startup_budget:
+        print(f"REGRESSION import[order_generator]: {startup:.3f}s over the {args.startup_budget:.3f}s startup budget")
+        return 1
+
+    cases = [case for case in build_cases(args.grid, args.max_orders) if not args.filter or args.filter in case_name(*case)]
+    results = measure(cases, args.repeat)
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save to create one.")
+        return 0
+
+    with open(args.baseline) as file:
+        regressions = compare(results, json.load(file), args.threshold, args.memory_threshold, args.min_seconds)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
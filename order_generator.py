@@ -1,22 +1,52 @@
-from periods.distribution import YearlyDistribution, MonthlyDistribution, DailyDistribution, HourlyDistribution
+from periods.distribution import DistributionPipeline
+from periods.schemas import Year, Month, Day, Hour
+from periods.generator import segment_offsets
+from periods.noiser import derive_rng
+from periods.intrahour import validate_minute_probabilities
+from periods.markov import MarkovProcess
+from periods.profiling import Profiler, RunStats
+from periods.cache import DistributionCache, cache_key
+from periods.summary import summarize, write_summary
+from periods.scenarios import scenario_counts, scenario_quantiles
+from orders.sinks import OrderSink
+from orders.materialize import OrderShard, collect_shard, profiled, write_shard
+from orders.sampler import AliasSampler, SeasonalItemSampler
+from orders.basket import BasketSampler
+from orders.customers import CustomerPopulation, period_days
+from orders.schema import item_columns, order_id_dtype, period_dtypes, validate_schema
+from orders.state import RunState, load_counts, load_state, save_state, validate_counts
+from orders.replay import OrderReplayer
 
-from datetime import datetime
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from multiprocessing import get_context
+from datetime import datetime, time, timedelta
+from itertools import repeat
+from typing import Iterator, List, Optional
 
 import numpy as np
 import polars as pl
 
-import seaborn as sns
-import matplotlib.pyplot as plt
-
 class OrderDistributionGenerator:
+    DEFAULT_CHUNK_ROWS = 1_000_000
+    ID_COLS: List[str] = []
+
     def __init__(self, start_date: datetime, end_date: datetime, total_orders: int, 
                  month_probabilities: Optional[List[float]] = None, 
                  day_of_week_factor: Optional[List[float]] = None, 
                  day_of_month_factor: Optional[List[float]] = None, 
                  hour_probabilities: Optional[List[float]] = None, 
                  linear_trend: Optional[float] = 0.0,
-                 noise_std_dev: Optional[float] = None):
+                 noise_std_dev: Optional[float] = None,
+                 seed: Optional[int] = None,
+                 apportionment: str = 'largest_remainder',
+                 minute_probabilities: Optional[List[float]] = None,
+                 markov: Optional[MarkovProcess] = None,
+                 profiler: Optional[Profiler] = None,
+                 cache: Optional[DistributionCache] = None,
+                 extension: int = 0,
+                 order_id_offset: int = 0,
+                 day_weights: Optional[List[float]] = None):
         
         self.start_date = start_date
         self.end_date = end_date
@@ -26,26 +56,138 @@ class OrderDistributionGenerator:
         self.day_of_week_factor = day_of_week_factor if day_of_week_factor else [1.0] * 7
         self.day_of_month_factor = day_of_month_factor if day_of_month_factor else [1.0] * 31
         self.hour_probabilities = hour_probabilities if hour_probabilities else [1.0 / 24] * 24
+        self.minute_probabilities = minute_probabilities if minute_probabilities else [1.0 / 60] * 60
+        validate_minute_probabilities(self.minute_probabilities)
         self.noise_std_dev = noise_std_dev
+        self.seed = seed
+        self.apportionment = apportionment
+        self.markov = markov
+        self.profiler = profiler
+        self.cache = cache
+        self.extension = extension
+        self.order_id_offset = order_id_offset
+        self.day_weights = day_weights
+        self.pipeline = self.build_pipeline()
 
-    def get_distribution(self, distribution_type: str):
-        if distribution_type == 'year':
-            generator =  YearlyDistribution(self.start_date, self.end_date, self.total_orders, self.noise_std_dev, self.linear_trend)
-            return generator.generate_years()
-        elif distribution_type == 'month':
-            generator =  MonthlyDistribution(self.start_date, self.end_date, self.total_orders, self.month_probabilities, self.noise_std_dev, self.linear_trend)
-            return generator.generate_months()
-        elif distribution_type == 'day':
-            generator =  DailyDistribution(self.start_date, self.end_date, self.total_orders, self.month_probabilities, self.day_of_week_factor, self.day_of_month_factor, self.noise_std_dev)
-            return generator.generate_days()
-        elif distribution_type == 'hour':
-            generator =  HourlyDistribution(self.start_date, self.end_date, self.total_orders, self.month_probabilities, self.hour_probabilities, self.day_of_week_factor, self.day_of_month_factor, self.noise_std_dev)
-            return generator.generate_hours()
-        else:
+    def build_pipeline(self) -> DistributionPipeline:
+        return DistributionPipeline(self.start_date, self.end_date, self.total_orders, 
+                                    self.month_probabilities, self.day_of_week_factor, 
+                                    self.day_of_month_factor, self.hour_probabilities, 
+                                    self.noise_std_dev, self.linear_trend, 
+                                    derive_rng(self.seed, (0, self.extension) if self.extension else (0,)), 
+                                    self.apportionment, self.markov, 
+                                    self.profiler, self.day_weights)
+
+    def noise_free(self) -> "OrderDistributionGenerator":
+        if self.noise_std_dev is None and self.markov is None:
+            return self
+        generator = copy(self)
+        generator.noise_std_dev, generator.markov, generator.profiler, generator.cache = None, None, None, None
+        generator.pipeline = generator.build_pipeline()
+        return generator
+
+    @property
+    def stats(self) -> Optional[RunStats]:
+        return self.profiler.stats if self.profiler is not None else None
+
+    def get_distribution(self, distribution_type: str) -> List[Year]:
+        return self.get_distribution_models(distribution_type)
+
+    def get_distribution_frame(self, distribution_type: str) -> pl.DataFrame:
+        level = 'hour' if distribution_type == 'timestamp' else distribution_type
+        if self.cache is None or not self.deterministic:
+            return self.pipeline.level(level)
+        return self.cache.fetch(self.cache_key, level, lambda: self.pipeline.level(level))
+
+    def get_distribution_models(self, distribution_type: str) -> List[Year]:
+        model = {'year': Year, 'month': Month, 'day': Day, 'hour': Hour, 'timestamp': Hour}.get(distribution_type)
+        if model is None:
             raise ValueError("Invalid distribution type. Choose from 'year', 'month', 'day', 'hour'.")
+        return [model(**row) for row in self.get_distribution_frame(distribution_type).iter_rows(named=True)]
+
+    @property
+    def deterministic(self) -> bool:
+        return self.seed is not None or (self.noise_std_dev is None and self.markov is None 
+                                         and self.apportionment == 'largest_remainder')
+
+    @property
+    def cache_key(self) -> str:
+        return cache_key({
+            'start_date': self.start_date, 'end_date': self.end_date, 'total_orders': self.total_orders,
+            'month_probabilities': self.month_probabilities, 'day_of_week_factor': self.day_of_week_factor,
+            'day_of_month_factor': self.day_of_month_factor, 'hour_probabilities': self.hour_probabilities,
+            'linear_trend': self.linear_trend, 'noise_std_dev': self.noise_std_dev, 'seed': self.seed,
+            'apportionment': self.apportionment, 'markov': self.markov.model_dump() if self.markov else None,
+            'extension': self.extension, 
+            'day_weights': list(self.day_weights) if self.day_weights is not None else None,
+        })
+
+    def save_state(self, path: str, distribution_type: str):
+        generator = self.get_distribution_frame(distribution_type)
+        counts = generator.select(
+            *[pl.col('hour_in_day' if col == 'hour' else col).alias(col) for col in self.get_time_col_names(distribution_type)],
+            pl.col('total_orders'), pl.lit(self.extension).alias('extension')
+        )
+
+        first_window = load_state(path) if self.extension else None
+        days = (self.end_date.date() - self.start_date.date()).days + 1
+        save_state(path, RunState(
+            start_date=self.start_date, end_date=self.end_date, distribution_type=distribution_type,
+            total_orders=self.total_orders, 
+            orders_per_day=first_window.orders_per_day if first_window else self.total_orders / days,
+            first_start_date=(first_window.first_start_date or first_window.start_date) if first_window else self.start_date,
+            first_end_date=(first_window.first_end_date or first_window.end_date) if first_window else self.end_date,
+            first_total_orders=(first_window.first_total_orders or first_window.total_orders) if first_window else self.total_orders,
+            month_probabilities=self.month_probabilities, day_of_week_factor=self.day_of_week_factor,
+            day_of_month_factor=self.day_of_month_factor, hour_probabilities=self.hour_probabilities,
+            minute_probabilities=self.minute_probabilities, linear_trend=self.linear_trend,
+            noise_std_dev=self.noise_std_dev, 
+            seed=self.seed if self.seed is not None else np.random.SeedSequence().entropy,
+            apportionment=self.apportionment, markov=self.markov, extension=self.extension,
+            last_order_id=self.order_id_offset + int(generator['total_orders'].sum()),
+        ), counts)
+
+    @classmethod
+    def resume(cls, path: str, end_date: datetime, total_orders: Optional[int] = None, 
+               **kwargs) -> "OrderDistributionGenerator":
+        state = load_state(path)
+        validate_counts(state, load_counts(path, state.extension))
+        start_date = datetime.combine(state.end_date.date() + timedelta(days=1), time())
+        if end_date.date() < start_date.date():
+            raise ValueError(f"Please provide an end_date after the saved end_date {state.end_date.date()}. Got {end_date.date()}.")
+
+        days = (end_date.date() - start_date.date()).days + 1
+        expected = cls.expected_daily_orders(state, end_date)[-days:]
+        return cls(start_date, end_date, total_orders if total_orders is not None else round(expected.sum()), 
+                   state.month_probabilities, state.day_of_week_factor, state.day_of_month_factor, 
+                   state.hour_probabilities, state.linear_trend, state.noise_std_dev, state.seed, 
+                   state.apportionment, state.minute_probabilities, state.markov, 
+                   extension=state.extension + 1, order_id_offset=state.last_order_id, 
+                   day_weights=expected.tolist(), **kwargs)
+
+    @staticmethod
+    def expected_daily_orders(state: RunState, end_date: datetime) -> np.ndarray:
+        # the noise-free profile over whole calendar years, so partial years and months never reshape it, 
+        # scaled so that the first window's days add up to its total
+        first_start = state.first_start_date if state.first_start_date else state.start_date
+        first_end = state.first_end_date if state.first_end_date else state.end_date
+        first_total = state.first_total_orders if state.first_total_orders is not None else state.total_orders
+        days = DistributionPipeline(datetime(first_start.year, 1, 1), datetime(end_date.year, 12, 31), 0, 
+                                    state.month_probabilities, state.day_of_week_factor, 
+                                    state.day_of_month_factor, state.hour_probabilities, 
+                                    linear_trend=state.linear_trend).days
+        expected = (days['year_probability'] * days['month_probability'] * days['day_probability']).to_numpy()
+
+        calendar_start = np.datetime64(first_start.year - 1970, 'Y').astype('datetime64[D]')
+        first = (np.datetime64(first_start.date(), 'D') - calendar_start).astype(np.int64)
+        first_end_index = (np.datetime64(first_end.date(), 'D') - calendar_start).astype(np.int64) + 1
+        last = (np.datetime64(end_date.date(), 'D') - calendar_start).astype(np.int64) + 1
+        return expected[first:last] * first_total / expected[first:first_end_index].sum()
 
     def print_orders_cumulated(self, distribution_type: str):
-        generator = self.get_distribution(distribution_type)
+        # timestamps share the hourly distribution
+        distribution_type = 'hour' if distribution_type == 'timestamp' else distribution_type
+        generator = self.get_distribution_frame(distribution_type)
         
         if distribution_type == 'year':
             format_str = "Year: {year}, Year prob {year_probability:.4f}, Orders {total_orders}"
@@ -59,42 +201,35 @@ class OrderDistributionGenerator:
             raise ValueError("Invalid distribution type. Choose from 'year', 'month', 'day', 'hour'.")
 
         sum_orders = 0
-        for item in generator:
-            print(format_str.format(**item.__dict__))
-            sum_orders += item.total_orders
+        for item in generator.iter_rows(named=True):
+            print(format_str.format(**item))
+            sum_orders += item['total_orders']
         print(f"Total Orders: {sum_orders}")
 
-    def plot_orders_cumulated(self, distribution_type: str):
-        generator = self.get_distribution(distribution_type)
-        
-        if distribution_type == 'year':
-            x_label = 'Year'
-        elif distribution_type == 'month':
-            x_label = 'Year-Month'
-        elif distribution_type == 'day':
-            x_label = 'Year-Month-Day'
-        elif distribution_type == 'hour':
-            x_label = 'Year-Month-Day-Hour'
-        else:
-            raise ValueError("Invalid distribution type. Choose from 'year', 'month', 'day', 'hour'.")
+    def summarize_orders(self, distribution_type: str, path: Optional[str] = None, 
+                         file_format: str = 'csv') -> pl.DataFrame:
+        summary = summarize(self.get_distribution_frame(distribution_type), self.noise_free().get_distribution_frame(distribution_type))
+        if path:
+            write_summary(summary, path, file_format)
+        return summary
 
-        data = []
-        for item in generator:
-            data.append({
-                'x': f"{item.year}-{item.month:02d}-{item.day_of_month:02d}-{item.hour_in_day:02d}" if distribution_type == 'hour' else
-                     f"{item.year}-{item.month:02d}-{item.day_of_month:02d}" if distribution_type == 'day' else
-                     f"{item.year}-{item.month:02d}" if distribution_type == 'month' else
-                     f"{item.year}",
-                'total_orders': item.total_orders
-            })
-
-        df = pl.DataFrame(data)
-        sns.barplot(x='x', y='total_orders', data=df)
-        plt.xlabel(x_label)
-        plt.ylabel('Total Orders')
-        plt.title(f'Total Orders by {x_label}')
-        plt.xticks(rotation=45)
-        plt.show()
+    def simulate_scenarios(self, distribution_type: str, scenarios: int, 
+                           quantiles: Optional[List[float]] = (0.05, 0.5, 0.95),
+                           batch_size: int = 1000):
+        counts = scenario_counts(self.start_date, self.end_date, self.total_orders, distribution_type, scenarios, 
+                                 self.month_probabilities, self.day_of_week_factor, self.day_of_month_factor, 
+                                 self.hour_probabilities, self.linear_trend, self.noise_std_dev, self.seed, 
+                                 self.apportionment, self.markov, batch_size)
+        if quantiles is None:
+            return counts
+        return scenario_quantiles(getattr(self.pipeline.generator, distribution_type), distribution_type, counts, list(quantiles))
+
+    def plot_orders_cumulated(self, distribution_type: str, kind: str = 'auto', 
+                              max_points: int = 2000, downsample: str = 'envelope'):
+        # the plotting stack is heavy, so headless generation never imports it
+        from periods.plotting import plot_orders_cumulated
+        distribution_type = 'hour' if distribution_type == 'timestamp' else distribution_type
+        plot_orders_cumulated(self.get_distribution_frame(distribution_type), distribution_type, kind, max_points, downsample)
 
     def create_orders_df(self, distribution_type: str, 
                         item_data: pl.DataFrame, 
@@ -102,102 +237,214 @@ class OrderDistributionGenerator:
                         item_price_col: Optional[str] = None, 
                         item_popularity_col: Optional[str] = None, 
                         allow_order_multiple: Optional[bool] = False,
-                        order_multiple_probability: Optional[float] = None) -> pl.DataFrame:
-        
-        generator = self.get_distribution(distribution_type)
+                        order_multiple_probability: Optional[float] = None,
+                        workers: Optional[int] = None,
+                        item_seasonality_col: Optional[str] = None,
+                        schema: str = 'default',
+                        basket: Optional[BasketSampler] = None,
+                        customers: Optional[CustomerPopulation] = None) -> pl.DataFrame:
         
+        shards = self.get_order_shards(distribution_type, item_data, item_name_col, item_price_col, 
+                                       item_popularity_col, allow_order_multiple, order_multiple_probability, 
+                                       workers, item_seasonality_col, schema, basket, customers)
+        if workers and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+                results = list(executor.map(profiled, repeat(collect_shard), shards, repeat(self.DEFAULT_CHUNK_ROWS)))
+            self.merge_records(results)
+            return pl.concat([frame for frame, _ in results])
+
+        return pl.concat([collect_shard(shard, self.DEFAULT_CHUNK_ROWS) for shard in shards])
+
+    def iter_orders(self, distribution_type: str, 
+                    item_data: pl.DataFrame, 
+                    item_name_col: str, 
+                    item_price_col: Optional[str] = None, 
+                    item_popularity_col: Optional[str] = None, 
+                    allow_order_multiple: Optional[bool] = False,
+                    order_multiple_probability: Optional[float] = None,
+                    chunk_rows: Optional[int] = None,
+                    item_seasonality_col: Optional[str] = None,
+                    schema: str = 'default',
+                    basket: Optional[BasketSampler] = None,
+                    customers: Optional[CustomerPopulation] = None) -> Iterator[pl.DataFrame]:
+
+        shards = self.get_order_shards(distribution_type, item_data, item_name_col, item_price_col, 
+                                       item_popularity_col, allow_order_multiple, order_multiple_probability, 
+                                       item_seasonality_col=item_seasonality_col, schema=schema, basket=basket, customers=customers)
+        if shards[-1].last_order == self.order_id_offset:
+            yield shards[0].materialize(0, 0)
+
+        for shard in shards:
+            yield from shard.iter_chunks(chunk_rows)
+
+    def replay_orders(self, distribution_type: str, 
+                      item_data: pl.DataFrame, 
+                      item_name_col: str, 
+                      item_price_col: Optional[str] = None, 
+                      item_popularity_col: Optional[str] = None, 
+                      allow_order_multiple: Optional[bool] = False,
+                      order_multiple_probability: Optional[float] = None,
+                      speedup: Optional[float] = 1.0,
+                      batch_rows: int = 10_000,
+                      chunk_rows: Optional[int] = None,
+                      item_seasonality_col: Optional[str] = None,
+                      schema: str = 'default',
+                      basket: Optional[BasketSampler] = None,
+                      customers: Optional[CustomerPopulation] = None) -> OrderReplayer:
+
+        if distribution_type not in ('hour', 'timestamp'):
+            raise ValueError(f"Replay needs the 'hour' or 'timestamp' distribution. Got {distribution_type}.")
+        chunks = self.iter_orders(distribution_type, item_data, item_name_col, item_price_col, 
+                                  item_popularity_col, allow_order_multiple, order_multiple_probability, 
+                                  chunk_rows=chunk_rows if chunk_rows else self.DEFAULT_CHUNK_ROWS, 
+                                  item_seasonality_col=item_seasonality_col, schema=schema, basket=basket, customers=customers)
+        return OrderReplayer(chunks, speedup, batch_rows)
+
+    def write_orders(self, path: str, 
+                     distribution_type: str, 
+                     item_data: pl.DataFrame, 
+                     item_name_col: str, 
+                     item_price_col: Optional[str] = None, 
+                     item_popularity_col: Optional[str] = None, 
+                     allow_order_multiple: Optional[bool] = False,
+                     order_multiple_probability: Optional[float] = None,
+                     file_format: str = 'parquet',
+                     partition_by: Optional[List[str]] = None,
+                     compression: str = 'zstd',
+                     row_group_size: int = 1_000_000,
+                     chunk_rows: Optional[int] = None,
+                     workers: Optional[int] = None,
+                     item_seasonality_col: Optional[str] = None,
+                     schema: str = 'default',
+                     basket: Optional[BasketSampler] = None,
+                     customers: Optional[CustomerPopulation] = None) -> List[str]:
+
+        chunk_rows = chunk_rows if chunk_rows else self.DEFAULT_CHUNK_ROWS
+        if workers and workers > 1:
+            shards = self.get_order_shards(distribution_type, item_data, item_name_col, item_price_col, 
+                                           item_popularity_col, allow_order_multiple, order_multiple_probability, 
+                                           workers, item_seasonality_col, schema, basket, customers)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+                results = list(executor.map(profiled, repeat(write_shard), shards, repeat(chunk_rows), repeat(path), 
+                                            repeat(file_format), repeat(partition_by), repeat(compression), 
+                                            repeat(row_group_size)))
+            self.merge_records(results)
+            return [file for shard_files, _ in results for file in shard_files]
+
+        chunks = self.iter_orders(distribution_type, item_data, item_name_col, item_price_col, 
+                                  item_popularity_col, allow_order_multiple, order_multiple_probability, 
+                                  chunk_rows=chunk_rows, item_seasonality_col=item_seasonality_col, schema=schema, basket=basket, customers=customers)
+
+        basename = f"part-e{self.extension}" if self.extension else 'part'
+        with OrderSink(path, file_format, partition_by, compression, row_group_size, basename) as sink:
+            for chunk in chunks:
+                sink.write(chunk)
+        return sink.files
+
+    def get_order_shards(self, distribution_type: str, 
+                         item_data: pl.DataFrame, 
+                         item_name_col: str, 
+                         item_price_col: Optional[str] = None, 
+                         item_popularity_col: Optional[str] = None, 
+                         allow_order_multiple: Optional[bool] = False,
+                         order_multiple_probability: Optional[float] = None,
+                         workers: Optional[int] = None,
+                         item_seasonality_col: Optional[str] = None,
+                         schema: str = 'default',
+                         basket: Optional[BasketSampler] = None,
+                         customers: Optional[CustomerPopulation] = None) -> List[OrderShard]:
+
+        validate_schema(schema)
+        generator = self.get_distribution_frame(distribution_type)
+        time_col_names = self.get_time_col_names(distribution_type)
+
+        dtypes = period_dtypes(schema)
+        period_columns = [pl.col(col) for col in self.ID_COLS]
+        period_columns += [pl.col('hour_in_day' if col == 'hour' else col).cast(dtypes[col]).alias(col) for col in time_col_names]
+        if distribution_type != 'year':
+            period_columns.append(self.order_date_expr(distribution_type, schema))
+        periods = generator.select(period_columns)
+
+        items = item_columns(item_data, item_name_col, item_price_col, schema)
+
+        sampler, seasons = None, None
+        if item_seasonality_col:
+            sampler = SeasonalItemSampler.from_item_data(item_data, item_seasonality_col, item_popularity_col)
+            seasons = sampler.seasons(generator)
+        elif item_popularity_col:
+            sampler = AliasSampler.from_item_data(item_data, item_popularity_col)
+
+        basket = basket if basket else BasketSampler(order_multiple_probability if allow_order_multiple else None)
+
+        columns = ['order_id'] + self.ID_COLS + (['customer_id'] if customers else []) + time_col_names + items.columns
+        if distribution_type != 'year':
+            columns.insert(1, 'order_date')
+
+        # workers get SeedSequence-derived streams even without a user seed
+        seed = self.seed
+        if seed is None and workers and workers > 1:
+            seed = np.random.SeedSequence().entropy
+
+        period_bounds = self.order_id_offset + np.concatenate(([0], np.cumsum(generator['total_orders'].to_numpy(), dtype=np.int64)))
+        shard_keys = self.get_shard_keys(generator, distribution_type)
+        timestamps = distribution_type == 'timestamp'
+        shard_ids = np.zeros(len(shard_keys), dtype=np.int64)
+        for col in shard_keys.columns:
+            values = shard_keys[col].to_numpy().astype(np.int64)
+            shard_ids = shard_ids * (int(values.max(initial=0)) + 1) + values
+        shard_offsets = segment_offsets(shard_ids)
+        customer_days = period_days(generator, self.start_date) if customers else None
+        span_days = ((self.end_date - self.start_date).days + 1) if customers else 0.0
+
+        return [
+            OrderShard(shard_keys.row(first), periods[first:last], period_bounds[first:last + 1], items, sampler, columns, 
+                       basket, seed, 
+                       timestamps, self.minute_probabilities if timestamps else None, 
+                       seasons[first:last] if seasons is not None else None, 
+                       order_id_dtype(schema, int(period_bounds[-1])), self.profiler, self.extension, 
+                       customers, customer_days[first:last] if customers else None, span_days, 
+                       order_id_dtype(schema, customers.size) if customers else pl.Int64)
+            for first, last in zip(shard_offsets[:-1], shard_offsets[1:])
+        ]
+
+    def get_shard_keys(self, generator: pl.DataFrame, distribution_type: str) -> pl.DataFrame:
+        return generator.select(['year'] if distribution_type == 'year' else ['year', 'month'])
+
+    def merge_records(self, results: List[tuple]):
+        if self.profiler is not None:
+            for _, records in results:
+                self.profiler.merge(records)
+
+    @staticmethod
+    def get_time_col_names(distribution_type: str) -> List[str]:
         if distribution_type == 'year':
-            time_col_names = ['year']
+            return ['year']
         elif distribution_type == 'month':
-            time_col_names = ['year', 'month']
+            return ['year', 'month']
         elif distribution_type == 'day':
-            time_col_names = ['year', 'month', 'day_of_month']
-        elif distribution_type == 'hour':
-            time_col_names = ['year', 'month', 'day_of_month', 'hour']
+            return ['year', 'month', 'day_of_month']
+        elif distribution_type in ('hour', 'timestamp'):
+            return ['year', 'month', 'day_of_month', 'hour']
         else:
-            raise ValueError("Invalid distribution_type. Supported types are 'year', 'month', 'day_of_month', 'hour'.")
-        
-        time_periods = {col: [] for col in time_col_names}
-        item_names = []
-        item_prices = []
-        order_ids = []
-        order_dates = []
-        
-        order_id_counter = 1
-        
-        for time_info in generator:
-            time_values = [getattr(time_info, col) for col in time_col_names]
-            total_orders_for_period = int(time_info.total_orders)
-            
-            for _ in range(total_orders_for_period):
-                if allow_order_multiple:
-                    num_items = np.random.geometric(p=order_multiple_probability)
-                else:
-                    num_items = 1
-                
-                if item_popularity_col:
-                    weights = item_data[item_popularity_col].to_list()
-                    weights = np.array(weights) / np.sum(weights)
-                    selected_item_names = np.random.choice(
-                        item_data[item_name_col].to_list(),
-                        p=weights,
-                        size=num_items,
-                        replace=True
-                    )
-                else:
-                    selected_item_names = np.random.choice(
-                        item_data[item_name_col].to_list(),
-                        size=num_items,
-                        replace=True
-                    )
-                
-                for col, value in zip(time_col_names, time_values):
-                    time_periods[col].extend([value] * num_items)
-                item_names.extend(selected_item_names)
-                
-                if item_price_col:
-                    item_price_dict = dict(zip(item_data[item_name_col], item_data[item_price_col]))
-                    selected_item_prices = [item_price_dict[item] for item in selected_item_names]
-                    item_prices.extend(selected_item_prices)
-                
-                order_ids.extend([order_id_counter] * num_items)
-                order_id_counter += 1
-                
-                if distribution_type != 'year':
-                    date_format = {
-                        'month': '%Y-%m',
-                        'day': '%Y-%m-%d',
-                        'hour': '%Y-%m-%d %H:%M:%S'
-                    }.get(distribution_type)
-                    
-                    order_date = datetime(
-                        year=time_values[0],
-                        month=time_values[1] if len(time_values) > 1 else 1,
-                        day=time_values[2] if len(time_values) > 2 else 1,
-                        hour=time_values[3] if len(time_values) > 3 else 0
-                    ).strftime(date_format)
-                    order_dates.extend([order_date] * num_items)
-        
-        orders_df = pl.DataFrame({
-            "order_id": order_ids,
-            **time_periods,
-            "item_name": item_names
-        })
-        
-        if item_price_col:
-            orders_df = orders_df.with_columns(pl.Series("item_price", item_prices))
-        
-        if distribution_type != 'year':
-            orders_df = orders_df.with_columns(pl.Series("order_date", order_dates))
+            raise ValueError("Invalid distribution_type. Supported types are 'year', 'month', 'day_of_month', 'hour', 'timestamp'.")
 
-        columns = list(orders_df.columns)
-        if 'order_date' in columns:
-            columns.remove('order_date')
-            order_date_index = columns.index('order_id') + 1
-            columns.insert(order_date_index, 'order_date')
-        
-        orders_df = orders_df.select(columns)
-        
-        print(orders_df)
-        return orders_df
-    
\ No newline at end of file
+    @staticmethod
+    def order_date_expr(distribution_type: str, schema: str = 'default') -> pl.Expr:
+        order_date = pl.datetime(
+            pl.col('year'),
+            pl.col('month'),
+            pl.col('day_of_month') if distribution_type in ('day', 'hour', 'timestamp') else 1,
+            pl.col('hour_in_day') if distribution_type in ('hour', 'timestamp') else 0,
+            time_unit='us'
+        )
+        if distribution_type in ('hour', 'timestamp') and (schema != 'default' or distribution_type == 'timestamp'):
+            return order_date.alias('order_date')
+        if schema != 'default':
+            return order_date.dt.date().alias('order_date')
+
+        date_format = {
+            'month': '%Y-%m',
+            'day': '%Y-%m-%d',
+            'hour': '%Y-%m-%d %H:%M:%S'
+        }.get(distribution_type)
+        return order_date.dt.strftime(date_format).alias('order_date')
@@ -0,0 +1,134 @@
+import numpy as np
+import polars as pl
+
+from typing import Callable, Optional
+
+AFFINITY_COLUMNS = ('item', 'related_item', 'weight')
+MAX_REDRAWS = 32
+
+class Baskets:
+    def __init__(self, items: np.ndarray, offsets: np.ndarray):
+        self.items = items
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+class ItemAffinity:
+    def __init__(self, items: np.ndarray, related: np.ndarray, weights: np.ndarray, item_count: int):
+        if len(items) and (min(items.min(), related.min()) < 0 or max(items.max(), related.max()) >= item_count):
+            raise ValueError(f"Affinity item indices must be in [0, {item_count}).")
+        if (weights <= 0).any():
+            raise ValueError("Affinity weights must be positive.")
+
+        # compressed sparse rows: the related items of item i are related[offsets[i]:offsets[i + 1]]
+        order = np.lexsort((related, items))
+        self.item_count = item_count
+        self.offsets = np.searchsorted(items[order], np.arange(item_count + 1)).astype(np.int64)
+        self.related = related[order].astype(np.int64)
+        self.cumulative = np.cumsum(weights[order].astype(np.float64))
+
+    @classmethod
+    def from_item_data(cls, affinity: pl.DataFrame, item_data: pl.DataFrame, item_name_col: str) -> "ItemAffinity":
+        missing = [col for col in AFFINITY_COLUMNS if col not in affinity.columns]
+        if missing:
+            raise ValueError(f"Please provide an affinity frame with {', '.join(AFFINITY_COLUMNS)} columns. Missing {', '.join(missing)}.")
+
+        names = item_data[item_name_col]
+        index = dict(zip(names.cast(pl.String).to_list(), range(len(names))))
+        unknown = set(affinity['item'].cast(pl.String).to_list() + affinity['related_item'].cast(pl.String).to_list()) - index.keys()
+        if unknown:
+            raise ValueError(f"Affinity items are not in item_data: {', '.join(sorted(unknown)[:5])}.")
+
+        def positions(col: str) -> np.ndarray:
+            return affinity[col].cast(pl.String).replace_strict(index, return_dtype=pl.Int64).to_numpy()
+        return cls(positions('item'), positions('related_item'), affinity['weight'].to_numpy(), len(names))
+
+    def sample(self, anchors: np.ndarray, rng=np.random) -> np.ndarray:
+        # one uniform per anchor locates its pick inside the anchor's slice of the cumulative weights
+        first, last = self.offsets[anchors], self.offsets[anchors + 1]
+        base = np.where(first > 0, self.cumulative[np.maximum(first - 1, 0)], 0.0)
+        totals = np.where(last > first, self.cumulative[np.maximum(last - 1, 0)] - base, 0.0)
+        picks = np.searchsorted(self.cumulative, base + rng.random(len(anchors)) * totals, side='right')
+        # anchors without related items index a neighbouring row here and are masked out below
+        related = self.related[np.clip(picks, first, last - 1)] if len(self.related) else anchors
+        return np.where(last > first, related, -1)
+
+class BasketSampler:
+    def __init__(self, order_multiple_probability: Optional[float] = None,
+                 replace: bool = True,
+                 affinity: Optional[ItemAffinity] = None,
+                 affinity_probability: float = 0.5,
+                 max_basket_size: Optional[int] = None):
+
+        if order_multiple_probability is not None and not 0 < order_multiple_probability <= 1:
+            raise ValueError(f"order_multiple_probability must be in (0, 1]. Got {order_multiple_probability}.")
+        if not 0 <= affinity_probability <= 1:
+            raise ValueError(f"affinity_probability must be in [0, 1]. Got {affinity_probability}.")
+        if max_basket_size is not None and max_basket_size < 1:
+            raise ValueError(f"max_basket_size must be a positive integer. Got {max_basket_size}.")
+
+        self.order_multiple_probability = order_multiple_probability
+        self.replace = replace
+        self.affinity = affinity
+        self.affinity_probability = affinity_probability
+        self.max_basket_size = max_basket_size
+
+    def sizes(self, count: int, item_count: int, rng=np.random) -> np.ndarray:
+        if self.order_multiple_probability is None:
+            return np.ones(count, dtype=np.int64)
+        sizes = rng.geometric(p=self.order_multiple_probability, size=count)
+        limit = self.max_basket_size
+        if not self.replace:
+            limit = min(limit, item_count) if limit else item_count
+        return np.minimum(sizes, limit) if limit else sizes
+
+    def sample(self, order_periods: np.ndarray, item_count: int,
+               draw: Callable[[np.ndarray], np.ndarray], rng=np.random) -> Baskets:
+        sizes = self.sizes(len(order_periods), item_count, rng)
+        offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+        item_periods = np.repeat(order_periods, sizes)
+        items = draw(item_periods)
+
+        if self.affinity is not None and len(items):
+            baskets = np.repeat(np.arange(len(sizes)), sizes)
+            follow_ups = np.flatnonzero((np.arange(len(items)) != offsets[baskets])
+                                        & (rng.random(len(items)) < self.affinity_probability))
+            related = self.affinity.sample(items[offsets[baskets[follow_ups]]], rng)
+            found = related >= 0
+            items[follow_ups[found]] = related[found]
+
+        if not self.replace and len(items):
+            items, offsets = self.deduplicate(items, offsets, item_periods, item_count, draw)
+        return Baskets(items.astype(np.int32 if item_count < np.iinfo(np.int32).max else np.int64), offsets)
+
+    def deduplicate(self, items: np.ndarray, offsets: np.ndarray, item_periods: np.ndarray,
+                    item_count: int, draw: Callable[[np.ndarray], np.ndarray]):
+        sizes = np.diff(offsets)
+        baskets = np.repeat(np.arange(len(sizes)), sizes)
+        # only baskets that collided are checked again after a redraw
+        candidates = np.flatnonzero(sizes[baskets] > 1)
+        for _ in range(MAX_REDRAWS):
+            duplicates = candidates[self.duplicates(baskets[candidates] * item_count + items[candidates])]
+            if not len(duplicates):
+                return items, offsets
+            items[duplicates] = draw(item_periods[duplicates])
+            collided = np.zeros(len(sizes), dtype=bool)
+            collided[baskets[duplicates]] = True
+            candidates = candidates[collided[baskets[candidates]]]
+
+        # heavily skewed popularity can keep colliding, those last line items are dropped
+        keep = np.ones(len(items), dtype=bool)
+        keep[candidates[self.duplicates(baskets[candidates] * item_count + items[candidates])]] = False
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(baskets[keep], minlength=len(sizes))))).astype(np.int64)
+        return items[keep], offsets
+
+    @staticmethod
+    def duplicates(keys: np.ndarray) -> np.ndarray:
+        order = np.argsort(keys, kind='stable')
+        repeated = np.flatnonzero(keys[order][1:] == keys[order][:-1]) + 1
+        return order[repeated]
@@ -0,0 +1,142 @@
+import math
+import warnings
+
+import numpy as np
+import polars as pl
+
+from datetime import datetime
+from typing import Optional, Tuple
+
+MAX_REJECTIONS = 64
+DAYS_PER_MONTH = 30.44
+
+def splitmix64(values: np.ndarray) -> np.ndarray:
+    with np.errstate(over='ignore'):
+        values = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return values ^ (values >> np.uint64(31))
+
+def coprime_multiplier(value: int, size: int) -> int:
+    value |= 1
+    while math.gcd(value, size) != 1:
+        value += 2
+    return value
+
+def period_days(periods: pl.DataFrame, start_date: datetime) -> np.ndarray:
+    starts = (periods['year'].to_numpy().astype(np.int64) - 1970).astype('datetime64[Y]').astype('datetime64[M]')
+    if 'month' in periods.columns:
+        starts = starts + (periods['month'].to_numpy().astype(np.int64) - 1)
+    starts = starts.astype('datetime64[h]')
+    if 'day_of_month' in periods.columns:
+        starts = starts + (periods['day_of_month'].to_numpy().astype(np.int64) - 1) * 24
+    if 'hour_in_day' in periods.columns:
+        starts = starts + periods['hour_in_day'].to_numpy().astype(np.int64)
+    return np.maximum((starts - np.datetime64(start_date, 'h')).astype(np.float64) / 24, 0.0)
+
+class CustomerPopulation:
+    def __init__(self, size: int,
+                 frequency_exponent: float = 1.1,
+                 initial_share: float = 1.0,
+                 churn_rate: Optional[float] = None,
+                 seed: int = 0):
+
+        if not 1 <= size < 2 ** 31:
+            raise ValueError(f"size must be a positive integer below 2 ** 31. Got {size}.")
+        if frequency_exponent < 0:
+            raise ValueError(f"frequency_exponent must be non-negative. Got {frequency_exponent}.")
+        if not 0 < initial_share <= 1:
+            raise ValueError(f"initial_share must be in (0, 1]. Got {initial_share}.")
+        if churn_rate is not None and not 0 <= churn_rate < 1:
+            raise ValueError(f"churn_rate must be a monthly probability in [0, 1). Got {churn_rate}.")
+        if churn_rate and initial_share == 1:
+            raise ValueError(f"churn_rate needs arriving customers to replace the churned ones, please provide initial_share < 1. Got {initial_share}.")
+
+        self.size = size
+        self.frequency_exponent = frequency_exponent
+        self.initial_share = initial_share
+        self.churn_rate = churn_rate
+        self.seed = seed
+        self.warned = False
+
+        # affine bijections on [0, size) spread frequency ranks over customer ids and over arrival positions,
+        # both invert, so the customers that have arrived by a day can be drawn directly
+        self.salt = splitmix64(np.array([seed + 2]))[0]
+        self.shift = int(splitmix64(np.array([seed]))[0] % np.uint64(size))
+        self.multiplier = coprime_multiplier(int(splitmix64(np.array([seed + 1]))[0] % np.uint64(size)), size)
+        self.arrival_shift = int(splitmix64(np.array([seed + 3]))[0] % np.uint64(size))
+        self.arrival_multiplier = coprime_multiplier(int(splitmix64(np.array([seed + 4]))[0] % np.uint64(size)), size)
+        self.inverse_multiplier = pow(self.multiplier, -1, size)
+        self.inverse_arrival_multiplier = pow(self.arrival_multiplier, -1, size)
+
+    @property
+    def lifecycle(self) -> bool:
+        return self.initial_share < 1 or bool(self.churn_rate)
+
+    def ranks(self, count: int, rng=np.random, size=None) -> np.ndarray:
+        # inverse CDF of a continuous power law on [1, size + 1): rank r is drawn with weight ~ (r + 1) ** -exponent
+        size = self.size if size is None else size
+        uniforms = rng.random(count)
+        exponent = self.frequency_exponent
+        if exponent == 1:
+            positions = (size + 1.0) ** uniforms
+        else:
+            positions = (1 + uniforms * ((size + 1.0) ** (1 - exponent) - 1)) ** (1 / (1 - exponent))
+        return np.minimum(positions.astype(np.int64) - 1, size - 1)
+
+    def customer_ids(self, ranks: np.ndarray) -> np.ndarray:
+        return (ranks * self.multiplier + self.shift) % self.size
+
+    def customer_ranks(self, customers: np.ndarray) -> np.ndarray:
+        return ((customers - self.shift) * self.inverse_multiplier) % self.size
+
+    def arrival_positions(self, ranks: np.ndarray) -> np.ndarray:
+        return (ranks * self.arrival_multiplier + self.arrival_shift) % self.size
+
+    def uniforms(self, customers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # customers arrive in the order of their arrival position, the lifetime draw is hashed from the id
+        hashes = splitmix64(customers.astype(np.uint64) + self.salt)
+        return (self.arrival_positions(self.customer_ranks(customers)) / self.size,
+                (hashes & np.uint64(0xFFFFFFFF)).astype(np.float64) * 2.0 ** -32)
+
+    def active(self, customers: np.ndarray, days: np.ndarray, span_days: float) -> np.ndarray:
+        # arrival and churn are pure functions of the id, so every shard and chunk agrees on them
+        arrivals, lifetimes = self.uniforms(customers)
+        arrival_days = np.zeros(len(customers))
+        if self.initial_share < 1:
+            arrival_days = np.maximum(arrivals - self.initial_share, 0.0) / (1 - self.initial_share) * span_days
+        active = arrival_days <= days
+        if self.churn_rate:
+            lifetime_days = -np.log1p(-lifetimes) * DAYS_PER_MONTH / -math.log1p(-self.churn_rate)
+            active &= days < arrival_days + lifetime_days
+        return active
+
+    def cohort(self, days: np.ndarray, span_days: float, rng=np.random) -> np.ndarray:
+        # the same power law over the arrival positions reached by each day, position 0 has always arrived,
+        # so the fallback keeps repeat purchases heavy-tailed with the earliest customers buying most
+        arrived = self.initial_share + (1 - self.initial_share) * np.minimum(days / span_days, 1.0)
+        counts = np.minimum(np.floor(arrived * self.size).astype(np.int64) + 1, self.size)
+        positions = self.ranks(len(days), rng, counts)
+        return self.customer_ids(((positions - self.arrival_shift) * self.inverse_arrival_multiplier) % self.size)
+
+    def assign(self, days: np.ndarray, span_days: float, rng=np.random) -> np.ndarray:
+        customers = self.customer_ids(self.ranks(len(days), rng))
+        if self.lifecycle:
+            pending = np.flatnonzero(~self.active(customers, days, span_days))
+            for _ in range(MAX_REJECTIONS):
+                if not len(pending):
+                    break
+                customers[pending] = self.customer_ids(self.ranks(len(pending), rng))
+                pending = pending[~self.active(customers[pending], days[pending], span_days)]
+
+            # days where few customers are active fall back to the customers that have arrived by then
+            for _ in range(MAX_REJECTIONS):
+                if not len(pending):
+                    break
+                customers[pending] = self.cohort(days[pending], span_days, rng)
+                pending = pending[~self.active(customers[pending], days[pending], span_days)]
+            if len(pending) and not self.warned:
+                self.warned = True
+                warnings.warn("Some orders fall on days where churn left almost no active customers and keep an inactive one. "
+                              "Please provide a larger size or a lower churn_rate.", RuntimeWarning)
+        return customers + 1
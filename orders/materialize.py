@@ -0,0 +1,185 @@
+import numpy as np
+import polars as pl
+
+from functools import cached_property
+from typing import Iterator, List, Optional, Tuple
+
+from periods.noiser import derive_rng
+from periods.intrahour import draw_minute_offsets, sort_hour_offsets
+from periods.profiling import Profiler, StageRecord, profile_stage
+from orders.sinks import OrderSink
+from orders.sampler import AliasSampler
+from orders.basket import BasketSampler
+from orders.customers import CustomerPopulation
+
+BLOCK_ORDERS = 1 << 16
+
+class OrderShard:
+    def __init__(self, key: Tuple[int, ...],
+                 periods: pl.DataFrame,
+                 period_bounds: np.ndarray,
+                 items: pl.DataFrame,
+                 sampler: Optional[AliasSampler],
+                 columns: List[str],
+                 basket: Optional[BasketSampler] = None,
+                 seed: Optional[int] = None,
+                 timestamps: bool = False,
+                 minute_probabilities: Optional[List[float]] = None,
+                 seasons: Optional[np.ndarray] = None,
+                 order_id_dtype: pl.DataType = pl.Int64,
+                 profiler: Optional[Profiler] = None,
+                 extension: int = 0,
+                 customers: Optional[CustomerPopulation] = None,
+                 customer_days: Optional[np.ndarray] = None,
+                 span_days: float = 0.0,
+                 customer_id_dtype: pl.DataType = pl.Int64):
+
+        self.key = key
+        self.periods = periods
+        self.period_bounds = period_bounds
+        self.items = items
+        self.sampler = sampler
+        self.columns = columns
+        self.basket = basket if basket else BasketSampler()
+        self.seed = seed
+        self.timestamps = timestamps
+        self.minute_probabilities = minute_probabilities
+        self.seasons = seasons
+        self.order_id_dtype = order_id_dtype
+        self.profiler = profiler
+        self.extension = extension
+        self.customers = customers
+        self.customer_days = customer_days
+        self.span_days = span_days
+        self.customer_id_dtype = customer_id_dtype
+        self.last_block = None
+
+    @property
+    def first_order(self) -> int:
+        return int(self.period_bounds[0])
+
+    @property
+    def last_order(self) -> int:
+        return int(self.period_bounds[-1])
+
+    @cached_property
+    def hour_bounds(self) -> np.ndarray:
+        # periods of several stores can share an hour, those start at the same order_date
+        order_date = self.periods['order_date']
+        starts = np.flatnonzero((order_date != order_date.shift(1)).fill_null(True).to_numpy())
+        return np.append(self.period_bounds[starts], self.last_order)
+
+    @property
+    def interleaved(self) -> bool:
+        return len(self.hour_bounds) < len(self.period_bounds)
+
+    def chunk_bounds(self, chunk_rows: Optional[int] = None) -> np.ndarray:
+        period_bounds = self.hour_bounds if self.timestamps else self.period_bounds
+        if chunk_rows is None:
+            return np.unique(period_bounds)
+        if chunk_rows < 1:
+            raise ValueError(f"chunk_rows must be a positive integer. Got {chunk_rows}.")
+        bounds = np.append(np.arange(self.first_order, self.last_order, chunk_rows, dtype=np.int64), self.last_order)
+        if self.timestamps:
+            # keep every hour in one chunk so its timestamps stay sorted across chunks
+            bounds = np.unique(period_bounds[np.searchsorted(period_bounds, bounds)])
+        return bounds
+
+    @property
+    def stream_key(self) -> Tuple[int, ...]:
+        return (*self.key, self.extension) if self.extension else self.key
+
+    def iter_chunks(self, chunk_rows: Optional[int] = None) -> Iterator[pl.DataFrame]:
+        bounds = self.chunk_bounds(chunk_rows)
+        for first_order, last_order in zip(bounds[:-1], bounds[1:]):
+            yield self.materialize(first_order, last_order)
+        self.last_block = None
+
+    def draw_items(self, item_periods: np.ndarray, rng=np.random) -> np.ndarray:
+        if self.sampler is not None:
+            return self.sampler.sample(len(item_periods), rng, self.seasons[item_periods] if self.seasons is not None else None)
+        return rng.choice(len(self.items), size=len(item_periods), replace=True)
+
+    def draw_block(self, block: int) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+        if self.last_block is not None and self.last_block[0] == block:
+            return self.last_block[1]
+
+        # every block of shard orders has its own stream, so chunk_rows never changes seeded output
+        first_order = self.first_order + block * BLOCK_ORDERS
+        order_ids = np.arange(first_order, min(first_order + BLOCK_ORDERS, self.last_order), dtype=np.int64)
+        order_periods = np.searchsorted(self.period_bounds, order_ids, side='right') - 1
+        rng = derive_rng(self.seed, (1, *self.stream_key, block))
+
+        with profile_stage(self.profiler, 'item_sampling') as stage:
+            baskets = self.basket.sample(order_periods, len(self.items), lambda item_periods: self.draw_items(item_periods, rng), rng)
+            offsets = draw_minute_offsets(len(order_ids), self.minute_probabilities, rng) if self.timestamps else None
+            stage.rows = len(baskets.items)
+
+        customer_ids = None
+        if self.customers is not None:
+            # customers have their own stream, so adding them leaves every other column of a seeded run unchanged
+            with profile_stage(self.profiler, 'customers') as stage:
+                customer_rng = derive_rng(self.seed, (3, *self.stream_key, block))
+                customer_ids = self.customers.assign(self.customer_days[order_periods], self.span_days, customer_rng)
+                stage.rows = len(customer_ids)
+
+        self.last_block = (block, (baskets.sizes, baskets.items, offsets, customer_ids))
+        return self.last_block[1]
+
+    def materialize(self, first_order: int, last_order: int) -> pl.DataFrame:
+        order_ids = np.arange(first_order, last_order, dtype=np.int64)
+        order_periods = np.searchsorted(self.period_bounds, order_ids, side='right') - 1
+
+        blocks = range(0)
+        if last_order > first_order:
+            blocks = range((first_order - self.first_order) // BLOCK_ORDERS, (last_order - 1 - self.first_order) // BLOCK_ORDERS + 1)
+        draws = [self.draw_block(block) for block in blocks]
+        start = first_order - self.first_order - blocks.start * BLOCK_ORDERS if draws else 0
+
+        def gather(position: int, dtype) -> np.ndarray:
+            return np.concatenate([draw[position] for draw in draws]) if draws else np.zeros(0, dtype=dtype)
+
+        sizes = gather(0, np.int64)
+        item_offsets = np.concatenate(([0], np.cumsum(sizes)))
+        num_items = sizes[start:start + len(order_ids)]
+        item_indices = gather(1, np.int32)[item_offsets[start]:item_offsets[start + len(order_ids)]]
+        item_periods = np.repeat(order_periods, num_items)
+
+        with profile_stage(self.profiler, 'assembly') as stage:
+            orders = pl.concat([
+                pl.DataFrame({"order_id": np.repeat(order_ids + 1, num_items)}, schema={"order_id": self.order_id_dtype}),
+                self.periods[item_periods],
+                self.items[item_indices]
+            ], how='horizontal')
+
+            if self.customers is not None:
+                customer_ids = gather(3, np.int64)[start:start + len(order_ids)]
+                orders = orders.with_columns(pl.Series('customer_id', np.repeat(customer_ids, num_items), dtype=self.customer_id_dtype))
+
+            if self.timestamps:
+                offsets = sort_hour_offsets(order_periods, gather(2, np.int64)[start:start + len(order_ids)])
+                orders = orders.with_columns(pl.col('order_date') + pl.Series(np.repeat(offsets, num_items).astype('timedelta64[us]')))
+                if self.interleaved:
+                    # offsets are sorted per store and hour, merge the stores of every hour and number 
+                    # the orders in that merged order, chunks hold whole hours so the ids stay in range
+                    orders = orders.sort('order_date', maintain_order=True).with_columns(
+                        (pl.col('order_id').rle_id() + first_order + 1).cast(self.order_id_dtype).alias('order_id'))
+
+            stage.rows = len(orders)
+            return orders.select(self.columns)
+
+def collect_shard(shard: OrderShard, chunk_rows: Optional[int] = None) -> pl.DataFrame:
+    return pl.concat([shard.materialize(shard.first_order, shard.first_order), *shard.iter_chunks(chunk_rows)])
+
+def profiled(function, shard: OrderShard, *args) -> Tuple[object, List[StageRecord]]:
+    return function(shard, *args), shard.profiler.records if shard.profiler is not None else []
+
+def write_shard(shard: OrderShard, chunk_rows: Optional[int], path: str, file_format: str,
+                partition_by: Optional[List[str]], compression: str, row_group_size: int) -> List[str]:
+    basename = "part-" + "-".join(str(value) for value in shard.key)
+    if shard.extension:
+        basename += f"-e{shard.extension}"
+    with OrderSink(path, file_format, partition_by, compression, row_group_size, basename) as sink:
+        for chunk in shard.iter_chunks(chunk_rows):
+            sink.write(chunk)
+    return sink.files
@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import numpy as np
+import polars as pl
+
+from typing import AsyncIterator, Iterable, Optional
+
+class ReplayMetrics:
+    def __init__(self):
+        self.orders = 0
+        self.rows = 0
+        self.batches = 0
+        self.max_lag_seconds = 0.0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return (self.finished if self.finished is not None else time.perf_counter()) - self.started
+
+    @property
+    def orders_per_second(self) -> float:
+        elapsed = self.elapsed_seconds
+        return self.orders / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (f"ReplayMetrics(orders={self.orders}, rows={self.rows}, batches={self.batches}, "
+                f"orders_per_second={self.orders_per_second:.0f}, max_lag_seconds={self.max_lag_seconds:.3f})")
+
+class QueueSink:
+    def __init__(self, maxsize: int = 16):
+        self.queue: "asyncio.Queue[Optional[pl.DataFrame]]" = asyncio.Queue(maxsize)
+
+    async def send(self, batch: pl.DataFrame):
+        await self.queue.put(batch)
+
+    async def close(self):
+        await self.queue.put(None)
+
+class FileSink:
+    def __init__(self, path: str):
+        self.file = open(path, "w")
+
+    async def send(self, batch: pl.DataFrame):
+        await asyncio.to_thread(self.file.write, batch.write_ndjson())
+
+    async def close(self):
+        await asyncio.to_thread(self.file.close)
+
+class SocketSink:
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def send(self, batch: pl.DataFrame):
+        if self.writer is None:
+            _, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(batch.write_ndjson().encode())
+        await self.writer.drain()
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+class OrderReplayer:
+    def __init__(self, chunks: Iterable[pl.DataFrame],
+                 speedup: Optional[float] = 1.0,
+                 batch_rows: int = 10_000,
+                 time_col: str = 'order_date'):
+
+        if speedup is not None and speedup <= 0:
+            raise ValueError(f"speedup must be positive, or None to replay as fast as possible. Got {speedup}.")
+        if batch_rows < 1:
+            raise ValueError(f"batch_rows must be a positive integer. Got {batch_rows}.")
+
+        self.chunks = iter(chunks)
+        self.speedup = speedup
+        self.batch_rows = batch_rows
+        self.time_col = time_col
+        self.metrics = ReplayMetrics()
+
+    def timestamps(self, chunk: pl.DataFrame) -> np.ndarray:
+        order_date = chunk[self.time_col]
+        if order_date.dtype == pl.String:
+            order_date = order_date.str.to_datetime()
+        elif order_date.dtype == pl.Date:
+            order_date = order_date.cast(pl.Datetime('us'))
+        return order_date.dt.epoch('us').to_numpy()
+
+    async def batches(self) -> AsyncIterator[pl.DataFrame]:
+        loop = asyncio.get_running_loop()
+        self.metrics = ReplayMetrics()
+        replay_start, first_timestamp, last_order_id = None, None, None
+
+        # materialize the next chunk in a thread while the current one is being replayed
+        pending = asyncio.ensure_future(asyncio.to_thread(next, self.chunks, None))
+        while True:
+            chunk = await pending
+            if chunk is None:
+                break
+            pending = asyncio.ensure_future(asyncio.to_thread(next, self.chunks, None))
+            if chunk.is_empty():
+                continue
+
+            timestamps = self.timestamps(chunk)
+            if replay_start is None:
+                replay_start, first_timestamp = loop.time(), timestamps[0]
+
+            for first in range(0, len(chunk), self.batch_rows):
+                last = min(first + self.batch_rows, len(chunk))
+                if self.speedup is not None:
+                    due = replay_start + (timestamps[last - 1] - first_timestamp) / 1e6 / self.speedup
+                    delay = due - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    else:
+                        self.metrics.max_lag_seconds = max(self.metrics.max_lag_seconds, -delay)
+
+                batch = chunk[first:last]
+                self.metrics.rows += len(batch)
+                # baskets can straddle two batches, count their order once
+                self.metrics.orders += batch['order_id'].n_unique() - (batch['order_id'][0] == last_order_id)
+                last_order_id = batch['order_id'][-1]
+                self.metrics.batches += 1
+                yield batch
+
+        self.metrics.finished = time.perf_counter()
+
+    async def run(self, sink) -> ReplayMetrics:
+        try:
+            async for batch in self.batches():
+                await sink.send(batch)
+        finally:
+            await sink.close()
+        return self.metrics
@@ -0,0 +1,92 @@
+import hashlib
+
+import numpy as np
+import polars as pl
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+SEASONALITY_KEYS = {12: 'month', 7: 'day_of_week'}
+
+def build_alias_table(weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    weights = np.asarray(weights, dtype=np.float64)
+    item_count = len(weights)
+    if item_count == 0 or weights.sum() <= 0 or (weights < 0).any():
+        raise ValueError("Item weights must be non-negative with a positive sum.")
+
+    probabilities = weights * item_count / weights.sum()
+    aliases = np.arange(item_count)
+    small = np.flatnonzero(probabilities < 1.0)
+    large = np.flatnonzero(probabilities >= 1.0)
+
+    # Vose's pairing in batches: every small item takes its missing mass from the large item
+    # whose cumulative spare capacity covers it, overdrawn large items become small next round
+    while len(small) and len(large):
+        deficits = 1.0 - probabilities[small]
+        owners = np.minimum(np.searchsorted(np.cumsum(probabilities[large] - 1.0), np.cumsum(deficits)), len(large) - 1)
+        aliases[small] = large[owners]
+        probabilities[large] -= np.bincount(owners, weights=deficits, minlength=len(large))
+
+        overdrawn = probabilities[large] < 1.0
+        small, large = large[overdrawn], large[~overdrawn]
+
+    probabilities[small] = 1.0
+    probabilities[large] = 1.0
+    return probabilities, aliases
+
+class AliasSampler:
+    cache: "OrderedDict[str, AliasSampler]" = OrderedDict()
+    cache_size = 8
+
+    def __init__(self, weights: np.ndarray):
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        self.item_count = weights.shape[1]
+        tables = [build_alias_table(row) for row in weights]
+        self.probabilities = np.concatenate([table[0] for table in tables])
+        self.aliases = np.concatenate([table[1] for table in tables])
+
+    @classmethod
+    def from_item_data(cls, item_data: pl.DataFrame, weight_col: str) -> "AliasSampler":
+        weights = item_data[weight_col].to_numpy().astype(np.float64)
+        key = f"{cls.__name__}:{weight_col}:{hashlib.sha1(weights.tobytes()).hexdigest()}"
+        return cls.cached(key, lambda: cls(weights))
+
+    @classmethod
+    def cached(cls, key: str, build) -> "AliasSampler":
+        if key in AliasSampler.cache:
+            AliasSampler.cache.move_to_end(key)
+        else:
+            AliasSampler.cache[key] = build()
+            if len(AliasSampler.cache) > AliasSampler.cache_size:
+                AliasSampler.cache.popitem(last=False)
+        return AliasSampler.cache[key]
+
+    def sample(self, size: int, rng=np.random, tables: Optional[np.ndarray] = None) -> np.ndarray:
+        slots = np.minimum((rng.random(size) * self.item_count).astype(np.int64), self.item_count - 1)
+        if tables is not None:
+            slots += tables * self.item_count
+        items = np.where(rng.random(size) < self.probabilities[slots], slots, self.aliases[slots])
+        return items % self.item_count if tables is not None else items
+
+class SeasonalItemSampler(AliasSampler):
+    def __init__(self, seasonality: np.ndarray, weights: Optional[np.ndarray] = None):
+        if seasonality.ndim != 2 or seasonality.shape[1] not in SEASONALITY_KEYS:
+            raise ValueError(f"Please provide 12 (per month) or 7 (per day of week) seasonality multipliers per item. Got shape {seasonality.shape}.")
+        if (seasonality < 0).any():
+            raise ValueError("Seasonality multipliers must be non-negative.")
+
+        self.key = SEASONALITY_KEYS[seasonality.shape[1]]
+        super().__init__(seasonality.T * (weights if weights is not None else 1.0))
+
+    @classmethod
+    def from_item_data(cls, item_data: pl.DataFrame, seasonality_col: str,
+                       weight_col: Optional[str] = None) -> "SeasonalItemSampler":
+        seasonality = np.vstack(item_data[seasonality_col].to_list()).astype(np.float64)
+        weights = item_data[weight_col].to_numpy().astype(np.float64) if weight_col else None
+        digest = hashlib.sha1(seasonality.tobytes() + (weights.tobytes() if weights is not None else b"")).hexdigest()
+        return cls.cached(f"{cls.__name__}:{seasonality_col}:{weight_col}:{digest}", lambda: cls(seasonality, weights))
+
+    def seasons(self, periods: pl.DataFrame) -> np.ndarray:
+        if self.key not in periods.columns:
+            raise ValueError(f"Seasonality by {self.key} needs a distribution type that has a {self.key} column.")
+        return periods[self.key].to_numpy().astype(np.int64) - (1 if self.key == 'month' else 0)
@@ -0,0 +1,34 @@
+import polars as pl
+
+from typing import Dict
+
+ORDER_SCHEMAS = ('default', 'compact', 'compact_cents')
+
+def validate_schema(schema: str):
+    if schema not in ORDER_SCHEMAS:
+        raise ValueError(f"Invalid schema. Choose from {', '.join(ORDER_SCHEMAS)}. Got {schema}.")
+
+def period_dtypes(schema: str) -> Dict[str, pl.DataType]:
+    if schema == 'default':
+        return {'year': pl.Int64, 'month': pl.Int64, 'day_of_month': pl.Int64, 'hour': pl.Int64}
+    return {'year': pl.UInt16, 'month': pl.UInt8, 'day_of_month': pl.UInt8, 'hour': pl.UInt8}
+
+def order_id_dtype(schema: str, order_count: int) -> pl.DataType:
+    if schema != 'default' and order_count < 2 ** 32:
+        return pl.UInt32
+    return pl.Int64
+
+def item_columns(item_data: pl.DataFrame, item_name_col: str, item_price_col: str, schema: str) -> pl.DataFrame:
+    name = pl.col(item_name_col).alias('item_name')
+    if schema != 'default':
+        name = name.cast(pl.Enum(item_data[item_name_col].cast(pl.String).unique(maintain_order=True)))
+
+    columns = [name]
+    if item_price_col and schema == 'compact_cents':
+        columns.append((pl.col(item_price_col) * 100).round(0).cast(pl.Int32).alias('item_price_cents'))
+    elif item_price_col and schema == 'compact':
+        columns.append(pl.col(item_price_col).cast(pl.Float32).alias('item_price'))
+    elif item_price_col:
+        columns.append(pl.col(item_price_col).alias('item_price'))
+
+    return item_data.select(columns)
@@ -0,0 +1,88 @@
+import polars as pl
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+FILE_FORMATS = ('parquet', 'ipc', 'csv')
+
+class OrderSink:
+    def __init__(self, path: str, 
+                 file_format: str = 'parquet', 
+                 partition_by: Optional[List[str]] = None, 
+                 compression: str = 'zstd', 
+                 row_group_size: int = 1_000_000,
+                 basename: str = 'part'):
+
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"Invalid file_format. Choose from {', '.join(FILE_FORMATS)}. Got {file_format}.")
+        if row_group_size < 1:
+            raise ValueError(f"row_group_size must be a positive integer. Got {row_group_size}.")
+
+        self.path = Path(path)
+        self.file_format = file_format
+        self.partition_by = partition_by if partition_by else []
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.basename = basename
+
+        self.files: List[str] = []
+        self.rows_written = 0
+        self.part_counters: Dict[Tuple, int] = {}
+        self.buffer_key: Optional[Tuple] = None
+        self.buffer: List[pl.DataFrame] = []
+        self.buffer_rows = 0
+
+    def __enter__(self) -> "OrderSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, chunk: pl.DataFrame):
+        if not self.partition_by:
+            self.append((), chunk)
+            return
+
+        missing = [col for col in self.partition_by if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Cannot partition by {missing}, columns are not in the orders frame.")
+
+        for key, part in chunk.partition_by(self.partition_by, maintain_order=True, as_dict=True).items():
+            self.append(key, part.drop(self.partition_by))
+
+    def append(self, key: Tuple, part: pl.DataFrame):
+        # chunks arrive in time order, so a new key means the buffered partition is complete
+        if self.buffer_key is not None and key != self.buffer_key:
+            self.flush()
+        self.buffer_key = key
+        self.buffer.append(part)
+        self.buffer_rows += len(part)
+        if self.buffer_rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer_rows:
+            return
+
+        directory = self.path.joinpath(*[f"{col}={value}" for col, value in zip(self.partition_by, self.buffer_key)])
+        directory.mkdir(parents=True, exist_ok=True)
+        part_number = self.part_counters.get(self.buffer_key, 0)
+        self.part_counters[self.buffer_key] = part_number + 1
+        file_path = directory / f"{self.basename}-{part_number:05d}.{self.file_format}"
+
+        frame = pl.concat(self.buffer)
+        if self.file_format == 'parquet':
+            frame.write_parquet(file_path, compression=self.compression, row_group_size=self.row_group_size)
+        elif self.file_format == 'ipc':
+            frame.write_ipc(file_path, compression=self.compression)
+        else:
+            frame.write_csv(file_path)
+
+        self.files.append(str(file_path))
+        self.rows_written += len(frame)
+        self.buffer = []
+        self.buffer_rows = 0
+
+    def close(self):
+        self.flush()
+        self.buffer_key = None
@@ -0,0 +1,62 @@
+import os
+
+import polars as pl
+
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+from periods.markov import MarkovProcess
+
+STATE_FILE = "state.json"
+
+class RunState(BaseModel):
+    start_date: datetime = Field(..., description="Start of the latest generated window")
+    end_date: datetime = Field(..., description="Last day that has been generated")
+    distribution_type: str = Field(..., description="Distribution type the orders were generated with")
+    total_orders: int = Field(..., description="Orders in the latest window")
+    orders_per_day: float = Field(..., description="Order rate of the first window")
+    first_start_date: Optional[datetime] = Field(None, description="Start of the first window, extensions are scaled to its profile")
+    first_end_date: Optional[datetime] = Field(None, description="Last day of the first window")
+    first_total_orders: Optional[int] = Field(None, description="Orders in the first window")
+    month_probabilities: List[float]
+    day_of_week_factor: List[float]
+    day_of_month_factor: List[float]
+    hour_probabilities: List[float]
+    minute_probabilities: List[float]
+    linear_trend: float = 0.0
+    noise_std_dev: Optional[float] = None
+    seed: int = Field(..., description="Seed every window derives its random streams from, fresh entropy for unseeded runs")
+    apportionment: str = 'largest_remainder'
+    markov: Optional[MarkovProcess] = None
+    extension: int = Field(0, description="Number of times the run has been extended")
+    last_order_id: int = Field(0, description="Highest order_id emitted so far")
+
+def save_state(path: str, state: RunState, counts: pl.DataFrame):
+    os.makedirs(path, exist_ok=True)
+    counts.write_parquet(os.path.join(path, f"counts-{state.extension:05d}.parquet"))
+
+    # replace atomically so an interrupted save keeps the previous state
+    staging = os.path.join(path, f".{STATE_FILE}")
+    with open(staging, "w") as file:
+        file.write(state.model_dump_json(indent=2))
+    os.replace(staging, os.path.join(path, STATE_FILE))
+
+def load_state(path: str) -> RunState:
+    with open(os.path.join(path, STATE_FILE)) as file:
+        return RunState.model_validate_json(file.read())
+
+def load_counts(path: str, extension: Optional[int] = None) -> pl.DataFrame:
+    pattern = "counts-*.parquet" if extension is None else f"counts-{extension:05d}.parquet"
+    return pl.read_parquet(os.path.join(path, pattern))
+
+def validate_counts(state: RunState, counts: pl.DataFrame):
+    # the latest window's counts must add up to its orders and end on the saved end_date, 
+    # otherwise the state and the counts come from different runs and a resume would not line up
+    if int(counts['total_orders'].sum()) != state.total_orders:
+        raise ValueError(f"The saved counts do not match the saved state, expected {state.total_orders} orders. Got {int(counts['total_orders'].sum())}.")
+    last = counts.row(-1, named=True) if len(counts) else {}
+    end = {'year': state.end_date.year, 'month': state.end_date.month, 'day_of_month': state.end_date.day}
+    saved_end = {col: last[col] for col in end if col in last}
+    if saved_end != {col: end[col] for col in saved_end} or not saved_end:
+        raise ValueError(f"The saved counts do not end on the saved end_date {state.end_date.date()}. Got {saved_end}.")
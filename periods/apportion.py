@@ -0,0 +1,155 @@
+import numpy as np
+
+from typing import Optional, Tuple
+
+from periods.noiser import RowStreams
+
+APPORTIONMENT_METHODS = ('largest_remainder', 'multinomial')
+DENSE_ORDERS_PER_PERIOD = 2
+
+def segment_positions(offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    lengths = np.diff(offsets)
+    segments = np.repeat(np.arange(len(lengths)), lengths)
+    positions = np.arange(offsets[-1]) - offsets[:-1][segments]
+    return segments, positions
+
+def largest_remainder(expected: np.ndarray, offsets: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    counts = np.floor(expected).astype(np.int64)
+    remainders = expected - counts
+    leftovers = np.asarray(totals, dtype=np.int64) - np.add.reduceat(counts, offsets[:-1]) if len(counts) else np.zeros(0, dtype=np.int64)
+    leftovers = np.clip(leftovers, 0, np.diff(offsets))
+
+    if len(offsets) == 2:
+        leftover = int(leftovers[0]) if len(leftovers) else 0
+        if leftover > 0:
+            counts[np.argpartition(-remainders, leftover - 1)[:leftover]] += 1
+        return counts
+
+    # select the top remainders of every parent on a (segments x longest segment) view
+    lengths = np.diff(offsets)
+    uniform = bool(np.all(lengths == lengths[0]))
+    if uniform:
+        padded = remainders.reshape(len(lengths), int(lengths[0]))
+    else:
+        segments, positions = segment_positions(offsets)
+        padded = np.full((len(lengths), int(lengths.max())), -1.0)
+        padded[segments, positions] = remainders
+
+    # parents are grouped by leftover count, so every group needs one partial selection at a single rank
+    thresholds = np.full(len(leftovers), np.inf)
+    order = np.argsort(leftovers, kind='stable')
+    bounds = np.searchsorted(leftovers[order], np.arange(1, int(leftovers.max(initial=0)) + 2))
+    for leftover, (first, last) in enumerate(zip(bounds[:-1], bounds[1:]), start=1):
+        if last > first:
+            rows = order[first:last]
+            rank = padded.shape[1] - leftover
+            thresholds[rows] = np.partition(padded[rows], rank, axis=1)[:, rank]
+    thresholds = thresholds[:, None]
+    above = padded > thresholds
+    ties = padded == thresholds
+    tie_ranks = np.cumsum(ties, axis=1, dtype=np.int32)
+    selected = above | (ties & (tie_ranks <= (leftovers - above.sum(axis=1))[:, None]))
+
+    return counts + (selected.ravel() if uniform else selected[segments, positions])
+
+def categorical_counts(weights: np.ndarray, offsets: np.ndarray, totals: np.ndarray, rng=np.random) -> np.ndarray:
+    # normalized exponential spacings give every parent its orders as sorted uniform points,
+    # so one linear merge with the cumulative weights counts the orders of every period
+    cumulative = np.cumsum(weights)
+    ends = cumulative[offsets[1:] - 1]
+    bases = np.concatenate(([0.0], ends[:-1]))
+    spacings = np.cumsum(rng.standard_exponential(int(totals.sum()) + len(totals)))
+    closing_index = np.cumsum(totals + 1) - 1
+    closing = spacings[closing_index]
+    opening = np.concatenate(([0.0], closing[:-1]))
+
+    parents = np.repeat(np.arange(len(totals)), totals)
+    scale = (ends - bases) / (closing - opening)
+    points = np.delete(spacings, closing_index) * scale[parents] + (bases - opening * scale)[parents]
+    # the last point of a parent is its largest, rounding must not push it into the next parent
+    last = (closing_index - np.arange(1, len(totals) + 1))[totals > 0]
+    limits = np.nextafter(ends, -np.inf)
+    if (points[last] >= limits[totals > 0]).any():
+        points = np.minimum(points, limits[parents])
+
+    # on ties the cumulative weight sorts first, so a point on a boundary belongs to the next period
+    merged = np.argsort(np.concatenate((cumulative, points)), kind='stable')
+    below = np.flatnonzero(merged < len(cumulative)) - np.arange(len(cumulative))
+    return np.diff(below, prepend=0)
+
+def binomial_counts(probabilities: np.ndarray, lengths: np.ndarray, totals: np.ndarray, rng=np.random) -> np.ndarray:
+    # conditional binomials, one vectorized draw per position across all parents
+    draws = np.zeros(probabilities.shape, dtype=np.int64)
+    remaining_orders = totals.copy()
+    remaining_probability = np.ones(len(lengths))
+    for position in range(probabilities.shape[1]):
+        probability = np.divide(probabilities[:, position], remaining_probability,
+                                out=np.zeros(len(lengths)), where=remaining_probability > 0)
+        probability = np.where(position == lengths - 1, 1.0, np.clip(probability, 0.0, 1.0))
+        probability[position >= lengths] = 0.0
+
+        draws[:, position] = rng.binomial(remaining_orders, probability)
+        remaining_orders -= draws[:, position]
+        remaining_probability -= probabilities[:, position]
+    return draws
+
+def multinomial(expected: np.ndarray, offsets: np.ndarray, totals: np.ndarray, rng=np.random) -> np.ndarray:
+    totals = np.asarray(totals, dtype=np.int64)
+    if isinstance(rng, RowStreams):
+        # every row draws its own segments from its own stream
+        segments, periods = (len(offsets) - 1) // len(rng), len(expected) // len(rng)
+        return np.concatenate([
+            multinomial(expected[row * periods:(row + 1) * periods],
+                        offsets[row * segments:(row + 1) * segments + 1] - row * periods,
+                        totals[row * segments:(row + 1) * segments], stream)
+            for row, stream in enumerate(rng.rngs)
+        ])
+
+    lengths = np.diff(offsets)
+    if not len(expected):
+        return np.zeros(0, dtype=np.int64)
+    segment_totals = np.add.reduceat(expected, offsets[:-1])
+    segments = np.repeat(np.arange(len(lengths)), lengths)
+    # parents without expected orders spread them uniformly
+    weights = expected if (segment_totals > 0).all() else np.where(segment_totals[segments] > 0, expected, 1.0)
+
+    # sparse parents sample their orders, dense parents draw one binomial per period
+    dense = totals > DENSE_ORDERS_PER_PERIOD * lengths
+    draws = np.zeros(len(expected), dtype=np.int64)
+    if not dense.all():
+        selected = ~dense[segments] if dense.any() else slice(None)
+        sparse_offsets = np.concatenate(([0], np.cumsum(lengths[~dense])))
+        draws[selected] = categorical_counts(weights[selected], sparse_offsets, totals[~dense], rng)
+    if dense.any():
+        rows = np.flatnonzero(dense)
+        selected = dense[segments]
+        row_offsets = np.concatenate(([0], np.cumsum(lengths[rows])))
+        row_segments, positions = segment_positions(row_offsets)
+        width = int(lengths[rows].max())
+        if isinstance(rng, np.random.Generator):
+            # right aligned, the last column takes the rounding remainder of every row
+            positions = positions + (width - lengths[rows])[row_segments]
+        probabilities = np.zeros((len(rows), width))
+        probabilities[row_segments, positions] = weights[selected]
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        if isinstance(rng, np.random.Generator):
+            counts = rng.multinomial(totals[rows], probabilities)
+        else:
+            counts = binomial_counts(probabilities, lengths[rows], totals[rows], rng)
+        draws[selected] = counts[row_segments, positions]
+    return draws
+
+def apportion(expected: np.ndarray,
+              offsets: np.ndarray,
+              totals: np.ndarray,
+              method: str = 'largest_remainder',
+              rng: Optional[np.random.Generator] = None) -> np.ndarray:
+
+    if len(expected) and expected.min() < 0:
+        raise ValueError(f"Expected orders must be non-negative. Got {expected.min()}.")
+    if method == 'largest_remainder':
+        return largest_remainder(expected, offsets, totals)
+    elif method == 'multinomial':
+        return multinomial(expected, offsets, totals, rng if rng is not None else np.random)
+    else:
+        raise ValueError(f"Invalid apportionment method. Choose from {', '.join(APPORTIONMENT_METHODS)}. Got {method}.")
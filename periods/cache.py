@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import polars as pl
+
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# bump whenever a change to the pipeline alters the distributions it produces
+CACHE_VERSION = 1
+
+def cache_key(params: dict) -> str:
+    payload = json.dumps({**params, 'cache_version': CACHE_VERSION, 'numpy': np.__version__}, 
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class DistributionCache:
+    def __init__(self, path: Optional[str] = None, max_bytes: int = 1 << 30, memory_items: int = 16):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.memory: "OrderedDict[str, pl.DataFrame]" = OrderedDict()
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+
+    def fetch(self, key: str, level: str, build: Callable[[], pl.DataFrame]) -> pl.DataFrame:
+        entry = f"{key}-{level}"
+        frame = self.memory.get(entry)
+        if frame is None and self.path:
+            frame = self.load(entry)
+        if frame is None:
+            frame = build()
+            if self.path:
+                self.store(entry, frame)
+
+        self.memory[entry] = frame
+        self.memory.move_to_end(entry)
+        if len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+        return frame
+
+    def load(self, entry: str) -> Optional[pl.DataFrame]:
+        directory = os.path.join(self.path, entry)
+        try:
+            with open(os.path.join(directory, "schema.json")) as file:
+                schema = json.load(file)
+            columns = [pl.Series(name, np.load(os.path.join(directory, f"{index}.npy"), mmap_mode='r'), dtype=getattr(pl, dtype))
+                       for index, (name, dtype) in enumerate(schema)]
+        except FileNotFoundError:
+            return None
+
+        os.utime(directory)
+        return pl.DataFrame(columns)
+
+    def store(self, entry: str, frame: pl.DataFrame):
+        # write next to the target and rename, so concurrent processes never see a partial entry
+        staging = tempfile.mkdtemp(dir=self.path, prefix=".staging-")
+        for index, column in enumerate(frame.columns):
+            np.save(os.path.join(staging, f"{index}.npy"), frame[column].to_numpy())
+        with open(os.path.join(staging, "schema.json"), "w") as file:
+            json.dump([[name, str(dtype)] for name, dtype in frame.schema.items()], file)
+
+        try:
+            os.rename(staging, os.path.join(self.path, entry))
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict(keep=entry)
+
+    def evict(self, keep: Optional[str] = None):
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.is_dir() and not entry.name.startswith("."):
+                size = sum(file.stat().st_size for file in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, entry.path, entry.name))
+
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, path, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name != keep:
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
+    def clear(self):
+        self.memory.clear()
+        if self.path:
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path, exist_ok=True)
@@ -1,12 +1,20 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
+from functools import cached_property
 from datetime import datetime
-import calendar
+
+import numpy as np
+import polars as pl
 
 from periods.schemas import Hour, Day, Month, Year
 from periods.noiser import Noiser
+from periods.apportion import APPORTIONMENT_METHODS, apportion
+from periods.markov import MarkovProcess
+from periods.profiling import Profiler, profile_stage
+
+from periods.generator import Generator, Periods
 
-from periods.generator import Generator
+DISTRIBUTION_TYPES = ('year', 'month', 'day', 'hour')
 
 class Distribution(BaseModel):
     probabilities: List[float] = Field(..., description="probability distribution for given period")
@@ -27,80 +35,181 @@ class Distribution(BaseModel):
             self.probabilities = noiser.apply_noise(self.probabilities)
         return self.probabilities
 
-class YearlyDistribution:
+class DistributionPipeline:
     def __init__(self, start_date: datetime, 
                  end_date: datetime, 
                  total_orders: int, 
-                 noise_std_dev: Optional[float] = None, 
-                 linear_trend: Optional[float] = 0.0):
-        
-        self.generator = Generator(start_date, end_date, total_orders)
-        self.linear_trend = linear_trend
-        self.year_probabilities = self.calculate_probabilities()
-        self.distribution = Distribution(probabilities=self.year_probabilities, noise_std_dev=noise_std_dev)
-        self.distribution.probabilities = self.year_probabilities
-        self.distribution.apply_noise()
-        total = sum(self.distribution.probabilities)
-        self.year_probabilities = [prob / total for prob in self.distribution.probabilities]
+                 month_probabilities: Optional[List[float]] = None, 
+                 day_of_week_factor: Optional[List[float]] = None, 
+                 day_of_month_factor: Optional[List[float]] = None, 
+                 hour_probabilities: Optional[List[float]] = None, 
+                 noise_std_dev: Optional[float] = None,
+                 linear_trend: Optional[float] = 0.0,
+                 rng: Optional[np.random.Generator] = None,
+                 apportionment: str = 'largest_remainder',
+                 markov: Optional[MarkovProcess] = None,
+                 profiler: Optional[Profiler] = None,
+                 day_weights: Optional[np.ndarray] = None):
+
+        self.generator = Generator(start_date, end_date, total_orders, profiler)
         self.total_orders = total_orders
+        self.month_probabilities = month_probabilities if month_probabilities else [1.0 / 12] * 12
+        self.day_of_week_factor = day_of_week_factor if day_of_week_factor else [1.0] * 7
+        self.day_of_month_factor = day_of_month_factor if day_of_month_factor else [1.0] * 31
+        self.hour_probabilities = hour_probabilities if hour_probabilities else [1.0 / 24] * 24
+        self.noise_std_dev = noise_std_dev
+        self.linear_trend = linear_trend if linear_trend else 0.0
+        self.rng = rng
+        self.apportionment = apportionment
+        self.markov = markov
+        self.profiler = profiler
+        self.day_weights = np.asarray(day_weights, dtype=float) if day_weights is not None else None
+        self.validate()
+
+    def validate(self):
+        if len(self.month_probabilities) != 12:
+            raise ValueError(f"Please provide probabilities for every month in a year. Got {len(self.month_probabilities)}.")
+        Distribution.validate_probabilities({"probabilities": self.month_probabilities})
 
-    def calculate_probabilities(self) -> List[float]:
-        probabilities = []
-        total_days = (self.generator.end_date - self.generator.start_date).days + 1
-        num_years = len(self.generator.year)
-
-        for i, year in enumerate(self.generator.year):
-            year_start = datetime(year.year, 1, 1)
-            year_end = datetime(year.year, 12, 31)
-
-            if year.year == self.generator.start_date.year:
-                year_start = self.generator.start_date
-            if year.year == self.generator.end_date.year:
-                year_end = self.generator.end_date
+        if len(self.day_of_week_factor) != 7:
+            raise ValueError(f"Please provide factors for every day in a week. Got {len(self.day_of_week_factor)}.")
+        if len(self.day_of_month_factor) != 31:
+            raise ValueError(f"Please provide factors for every day in a month. Got {len(self.day_of_month_factor)}.")
 
-            year_days = (year_end - year_start).days + 1
-            year_probability = year_days / total_days
+        if len(self.hour_probabilities) != 24:
+            raise ValueError(f"Please provide probabilities for every hour in a day. Got {len(self.hour_probabilities)}.")
+        Distribution.validate_probabilities({"probabilities": self.hour_probabilities})
 
-            if self.linear_trend != 0 and num_years > 1:
-                trend_factor = 1 + self.linear_trend * (i / (num_years - 1))
-                year_probability *= trend_factor
+        if self.apportionment not in APPORTIONMENT_METHODS:
+            raise ValueError(f"Invalid apportionment method. Choose from {', '.join(APPORTIONMENT_METHODS)}. Got {self.apportionment}.")
 
-            year.year_probability = year_probability
-            probabilities.append(year_probability)
+        if self.day_weights is not None and len(self.day_weights) != len(self.generator.day):
+            raise ValueError(f"Please provide a weight for every day between start_date and end_date. Got {len(self.day_weights)}.")
 
-        total_probability = sum(probabilities)
-        probabilities = [prob / total_probability for prob in probabilities]
+    def level(self, distribution_type: str) -> pl.DataFrame:
+        if distribution_type not in DISTRIBUTION_TYPES:
+            raise ValueError("Invalid distribution type. Choose from 'year', 'month', 'day', 'hour'.")
+        return getattr(self, f"{distribution_type}s")
 
+    def apply_noise(self, probabilities: np.ndarray) -> np.ndarray:
+        if self.noise_std_dev is not None:
+            with profile_stage(self.profiler, 'noise') as stage:
+                probabilities = Noiser(self.noise_std_dev, self.rng).apply_noise(probabilities)
+                stage.rows = len(probabilities)
+        return np.asarray(probabilities, dtype=float)
+
+    def apply_trend(self, probabilities: np.ndarray) -> np.ndarray:
+        count = len(probabilities)
+        if self.linear_trend != 0 and count > 1:
+            probabilities = probabilities * (1 + self.linear_trend * (np.arange(count) / (count - 1)))
         return probabilities
 
-    def generate_years(self) -> List[Year]:
-        years = []
-        total_order_count = 0
-        remainders = []
+    @cached_property
+    def month_weights(self) -> np.ndarray:
+        return self.generator.day.segment_sum(self.day_weights)
 
-        for i, year_obj in enumerate(self.generator.year):
-            year_probability = self.year_probabilities[i]
-            year_total_orders = self.total_orders * year_probability
+    def apply_markov(self, level: str, probabilities: np.ndarray) -> np.ndarray:
+        if self.markov is not None and self.markov.level == level:
+            probabilities = probabilities * self.markov.simulate(len(probabilities), rng=self.rng if self.rng is not None else np.random)[0]
+        return probabilities
 
-            int_orders = int(year_total_orders)
-            total_order_count += int_orders
+    def build_level(self, periods: Periods, parent: Optional[pl.DataFrame], time_cols: List[str], 
+                    probability_col: str, probabilities: np.ndarray) -> pl.DataFrame:
+        if parent is None:
+            parent = pl.DataFrame({"total_orders": [self.total_orders]})
+        parent_totals = parent["total_orders"].to_numpy()
+        parent = parent[periods.parent_index]
+
+        with profile_stage(self.profiler, 'apportionment') as stage:
+            total_orders = apportion(parent_totals[periods.parent_index] * probabilities, periods.offsets, 
+                                     parent_totals, self.apportionment, self.rng)
+            stage.rows = len(total_orders)
+
+        with profile_stage(self.profiler, 'assembly') as stage:
+            level = parent.with_columns(
+                *[pl.Series(col, getattr(periods, col)) for col in time_cols],
+                pl.Series(probability_col, probabilities),
+                pl.Series("total_orders", total_orders)
+            )
 
-            remainder = year_total_orders - int_orders
-            remainders.append((remainder, i))
+            columns = [col for col in level.columns if not col.endswith("_probability") and col != "total_orders"]
+            columns += [col for col in level.columns if col.endswith("_probability")]
+            stage.rows = len(level)
+            return level.select(columns + ["total_orders"])
+
+    @cached_property
+    def years(self) -> pl.DataFrame:
+        periods = self.generator.year
+        with profile_stage(self.profiler, 'probabilities') as stage:
+            if self.day_weights is not None:
+                probabilities = self.generator.month.segment_sum(self.month_weights)
+            else:
+                probabilities = self.apply_trend(periods.days / periods.days.sum())
+            probabilities = periods.normalize(self.apply_noise(periods.normalize(probabilities)))
+            stage.rows = len(probabilities)
+        return self.build_level(periods, None, ["year"], "year_probability", probabilities)
+
+    @cached_property
+    def months(self) -> pl.DataFrame:
+        periods = self.generator.month
+        with profile_stage(self.profiler, 'probabilities') as stage:
+            if self.day_weights is not None:
+                probabilities = self.month_weights
+            else:
+                first_of_month = periods.start.astype('datetime64[M]')
+                full_month_days = ((first_of_month + 1).astype('datetime64[D]') - first_of_month.astype('datetime64[D]')).astype(int)
+
+                probabilities = np.asarray(self.month_probabilities)[periods.month - 1] * (periods.days / full_month_days)
+                probabilities = self.apply_trend(probabilities)
+            probabilities = periods.normalize(self.apply_noise(probabilities))
+            stage.rows = len(probabilities)
+        return self.build_level(periods, self.years, ["month"], "month_probability", probabilities)
+
+    @cached_property
+    def days(self) -> pl.DataFrame:
+        periods = self.generator.day
+        with profile_stage(self.profiler, 'probabilities') as stage:
+            probabilities = self.apply_noise(np.full(len(periods), 1.0 / len(periods)))
+            if self.day_weights is not None:
+                probabilities = probabilities * self.day_weights
+            else:
+                probabilities = (probabilities
+                                 * np.asarray(self.day_of_month_factor)[periods.day_of_month - 1]
+                                 * np.asarray(self.day_of_week_factor)[periods.day_of_week])
+            probabilities = periods.normalize(self.apply_markov('day', probabilities))
+            stage.rows = len(probabilities)
+        return self.build_level(periods, self.months, ["day_of_month", "day_of_week"], "day_probability", probabilities)
+
+    @cached_property
+    def hours(self) -> pl.DataFrame:
+        periods = self.generator.hour
+        with profile_stage(self.profiler, 'probabilities') as stage:
+            profile = self.apply_noise(np.asarray(self.hour_probabilities, dtype=float))
+            probabilities = periods.normalize(self.apply_markov('hour', profile[periods.hour_in_day]))
+            stage.rows = len(probabilities)
+        return self.build_level(periods, self.days, ["hour_in_day"], "hour_probability", probabilities)
 
-            year = Year(
-                year=year_obj.year,
-                year_probability=year_probability,
-                total_orders=int_orders
-            )
-            years.append(year)
+class YearlyDistribution:
+    def __init__(self, start_date: datetime, 
+                 end_date: datetime, 
+                 total_orders: int, 
+                 noise_std_dev: Optional[float] = None, 
+                 linear_trend: Optional[float] = 0.0,
+                 pipeline: Optional[DistributionPipeline] = None):
+        
+        self.pipeline = pipeline if pipeline else DistributionPipeline(start_date, end_date, total_orders, 
+                                                                       noise_std_dev=noise_std_dev, 
+                                                                       linear_trend=linear_trend)
+        self.generator = self.pipeline.generator
+        self.linear_trend = linear_trend
+        self.total_orders = total_orders
 
-        remaining_orders = self.total_orders - total_order_count
-        remainders.sort(reverse=True, key=lambda x: x[0])
-        for _, i in remainders[:remaining_orders]:
-            years[i].total_orders += 1
+    @property
+    def year_probabilities(self) -> np.ndarray:
+        return self.pipeline.years["year_probability"].to_numpy()
 
-        return years
+    def generate_years(self) -> List[Year]:
+        return [Year(**row) for row in self.pipeline.years.iter_rows(named=True)]
     
 class MonthlyDistribution:
     def __init__(self, start_date: datetime, 
@@ -108,96 +217,23 @@ class MonthlyDistribution:
                  total_orders: int, 
                  month_probabilities: List[float], 
                  noise_std_dev: Optional[float] = None, 
-                 linear_trend: Optional[float] = 0.0):
+                 linear_trend: Optional[float] = 0.0,
+                 pipeline: Optional[DistributionPipeline] = None):
         
-        self.generator = Generator(start_date, end_date, total_orders)
+        self.pipeline = pipeline if pipeline else DistributionPipeline(start_date, end_date, total_orders, 
+                                                                       month_probabilities=month_probabilities, 
+                                                                       noise_std_dev=noise_std_dev, 
+                                                                       linear_trend=linear_trend)
+        self.generator = self.pipeline.generator
         self.linear_trend = linear_trend
-        self.validate_month_probabilities(month_probabilities)
-        self.distribution = Distribution(probabilities=month_probabilities, noise_std_dev=noise_std_dev)
-        self.month_probabilities = self.calculate_probabilities()
         self.total_orders = total_orders
-        self.yearly_distribution = YearlyDistribution(start_date, end_date, total_orders, noise_std_dev, linear_trend)
 
-    def validate_month_probabilities(self, month_probabilities: List[float]):
-        if len(month_probabilities) != 12:
-            raise ValueError(f"Please provide probabilities for every month in a year. Got {len(month_probabilities)}.")
-        
-        Distribution.validate_probabilities({"probabilities": month_probabilities})
-
-    def calculate_probabilities(self) -> List[float]:
-        month_count = len(self.generator.month)
-        adjusted_probabilities = [0] * month_count
-
-        for i, month_obj in enumerate(self.generator.month):
-            total_days_in_month = calendar.monthrange(month_obj.year, month_obj.month)[1]
-
-            if i == 0:  # First month
-                end_of_month = datetime(month_obj.year, month_obj.month, total_days_in_month)
-                days_remaining = (end_of_month - self.generator.start_date).days + 1
-                adjusted_probabilities[i] = days_remaining / total_days_in_month
-            elif i == month_count - 1:  # Last month
-                days_used = (self.generator.end_date - datetime(month_obj.year, month_obj.month, 1)).days + 1
-                adjusted_probabilities[i] = days_used / total_days_in_month
-            else:  # Middle months
-                adjusted_probabilities[i] = 1
-
-        combined_probabilities = [self.distribution.probabilities[(month_obj.month - 1) % 12] * adjusted_probabilities[i] for i, month_obj in enumerate(self.generator.month)]
-
-        if self.linear_trend != 0 and month_count > 1:
-            for i in range(month_count):
-                trend_factor = 1 + self.linear_trend * (i / (month_count - 1))
-                combined_probabilities[i] *= trend_factor
-
-        self.distribution.probabilities = combined_probabilities
-        self.distribution.apply_noise()
-
-        year_probabilities = {}
-        for i, month_obj in enumerate(self.generator.month):
-            year = month_obj.year
-            if year not in year_probabilities:
-                year_probabilities[year] = []
-            year_probabilities[year].append(self.distribution.probabilities[i])
-
-        normalized_probabilities = []
-        for year in year_probabilities:
-            total = sum(year_probabilities[year])
-            normalized_year_probabilities = [prob / total for prob in year_probabilities[year]]
-            normalized_probabilities.extend(normalized_year_probabilities)
-
-        return normalized_probabilities
+    @property
+    def month_probabilities(self) -> np.ndarray:
+        return self.pipeline.months["month_probability"].to_numpy()
 
     def generate_months(self) -> List[Month]:
-        months = []
-        total_order_count = 0
-        remainders = []
-        yearly_data = {year.year: year for year in self.yearly_distribution.generate_years()}
-
-        for i, month_obj in enumerate(self.generator.month):
-            year_info = yearly_data[month_obj.year]
-            month_probability = self.month_probabilities[i]
-            month_total_orders = year_info.total_orders * month_probability
-
-            int_orders = int(month_total_orders)
-            total_order_count += int_orders
-
-            remainder = month_total_orders - int_orders
-            remainders.append((remainder, i))
-
-            month = Month(
-                year=month_obj.year,
-                year_probability=year_info.year_probability,
-                total_orders=int_orders,
-                month=month_obj.month,
-                month_probability=month_probability
-            )
-            months.append(month)
-
-        remaining_orders = self.total_orders - total_order_count
-        remainders.sort(reverse=True, key=lambda x: x[0])
-        for _, i in remainders[:remaining_orders]:
-            months[i].total_orders += 1
-
-        return months
+        return [Month(**row) for row in self.pipeline.months.iter_rows(named=True)]
     
 class DailyDistribution:
     def __init__(self, start_date: datetime, 
@@ -207,86 +243,26 @@ class DailyDistribution:
                  day_of_week_factor: Optional[List[float]] = None, 
                  day_of_month_factor: Optional[List[float]] = None, 
                  noise_std_dev: Optional[float] = None,
-                 linear_trend: Optional[float] = 0.0):
+                 linear_trend: Optional[float] = 0.0,
+                 pipeline: Optional[DistributionPipeline] = None,
+                 markov: Optional[MarkovProcess] = None):
         
-        self.generator = Generator(start_date, end_date, total_orders)
-        self.day_of_week_factor = day_of_week_factor if day_of_week_factor else [1.0] * 7
-        self.day_of_month_factor = day_of_month_factor if day_of_month_factor else [1.0] * 31
-        self.validate_factors()
-
-        day_count = len(self.generator.day)
-        uniform_probabilities = [1.0 / day_count] * day_count
-        self.distribution = Distribution(probabilities=uniform_probabilities, noise_std_dev=noise_std_dev)
-        self.distribution.apply_noise()
-        self.day_probabilities = self.calculate_probabilities()
+        self.pipeline = pipeline if pipeline else DistributionPipeline(start_date, end_date, total_orders, 
+                                                                       month_probabilities=month_probabilities, 
+                                                                       day_of_week_factor=day_of_week_factor, 
+                                                                       day_of_month_factor=day_of_month_factor, 
+                                                                       noise_std_dev=noise_std_dev, 
+                                                                       linear_trend=linear_trend, 
+                                                                       markov=markov)
+        self.generator = self.pipeline.generator
         self.total_orders = total_orders
 
-        self.yearly_distribution = YearlyDistribution(start_date, end_date, total_orders, noise_std_dev, linear_trend)
-        self.monthly_distribution = MonthlyDistribution(start_date, end_date, total_orders, month_probabilities, noise_std_dev, linear_trend)
-
-    def validate_factors(self):
-        if len(self.day_of_week_factor) != 7:
-            raise ValueError(f"Please provide factors for every day in a week. Got {len(self.day_of_week_factor)}.")
-        if len(self.day_of_month_factor) != 31:
-            raise ValueError(f"Please provide factors for every day in a month. Got {len(self.day_of_month_factor)}.")
-
-    def calculate_probabilities(self) -> List[float]:
-        day_count = len(self.generator.day)
-        adjusted_probabilities = [0] * day_count
-
-        for i, day_obj in enumerate(self.generator.day):
-            adjusted_probabilities[i] = self.day_of_month_factor[day_obj.day_of_month - 1] * self.day_of_week_factor[day_obj.day_of_week] * self.distribution.probabilities[i]
-
-        month_indices = {}
-        for i, day_obj in enumerate(self.generator.day):
-            if day_obj.month not in month_indices:
-                month_indices[day_obj.month] = []
-            month_indices[day_obj.month].append(i)
-
-        normalized_probabilities = [0] * day_count
-        for month, indices in month_indices.items():
-            month_combined_probabilities = [adjusted_probabilities[i] for i in indices]
-            total_month_combined_prob = sum(month_combined_probabilities)
-            for i in indices:
-                normalized_probabilities[i] = adjusted_probabilities[i] / total_month_combined_prob
-
-        return normalized_probabilities
+    @property
+    def day_probabilities(self) -> np.ndarray:
+        return self.pipeline.days["day_probability"].to_numpy()
 
     def generate_days(self) -> List[Day]:
-        days = []
-        total_order_count = 0
-        remainders = []
-        monthly_data = {(month.year, month.month): month for month in self.monthly_distribution.generate_months()}
-
-        for i, day_obj in enumerate(self.generator.day):
-            month_info = monthly_data[(day_obj.year, day_obj.month)]
-            day_probability = self.day_probabilities[i]
-            day_total_orders = month_info.total_orders * day_probability
-
-            int_orders = int(day_total_orders)
-            total_order_count += int_orders
-            
-            remainder = day_total_orders - int_orders
-            remainders.append((remainder, i))
-
-            day = Day(
-                year=day_obj.year,
-                year_probability=month_info.year_probability,
-                month=day_obj.month,
-                month_probability=month_info.month_probability,
-                day_of_month=day_obj.day_of_month,
-                day_of_week=day_obj.day_of_week,
-                day_probability=day_probability,
-                total_orders=int_orders
-            )
-            days.append(day)
-
-        remaining_orders = self.total_orders - total_order_count
-        remainders.sort(reverse=True, key=lambda x: x[0])
-        for _, i in remainders[:remaining_orders]:
-            days[i].total_orders += 1
-
-        return days
+        return [Day(**row) for row in self.pipeline.days.iter_rows(named=True)]
 
 class HourlyDistribution:
     def __init__(self, start_date: datetime, 
@@ -297,81 +273,24 @@ class HourlyDistribution:
                  day_of_week_factor: Optional[List[float]] = None, 
                  day_of_month_factor: Optional[List[float]] = None, 
                  noise_std_dev: Optional[float] = None,
-                 linear_trend: Optional[float] = 0.0):
+                 linear_trend: Optional[float] = 0.0,
+                 pipeline: Optional[DistributionPipeline] = None,
+                 markov: Optional[MarkovProcess] = None):
         
-        self.generator = Generator(start_date, end_date, total_orders)
-        self.validate_hour_probabilities(hour_probabilities)
-        self.distribution = Distribution(probabilities=hour_probabilities, noise_std_dev=noise_std_dev)
-        self.hour_probabilities = self.calculate_probabilities(hour_probabilities)
+        self.pipeline = pipeline if pipeline else DistributionPipeline(start_date, end_date, total_orders, 
+                                                                       month_probabilities=month_probabilities, 
+                                                                       day_of_week_factor=day_of_week_factor, 
+                                                                       day_of_month_factor=day_of_month_factor, 
+                                                                       hour_probabilities=hour_probabilities, 
+                                                                       noise_std_dev=noise_std_dev, 
+                                                                       linear_trend=linear_trend, 
+                                                                       markov=markov)
+        self.generator = self.pipeline.generator
         self.total_orders = total_orders
 
-        self.yearly_distribution = YearlyDistribution(start_date, end_date, total_orders, noise_std_dev, linear_trend)
-        self.monthly_distribution = MonthlyDistribution(start_date, end_date, total_orders, month_probabilities, noise_std_dev, linear_trend)
-        self.daily_distribution = DailyDistribution(start_date, end_date, total_orders, month_probabilities, day_of_week_factor, day_of_month_factor, noise_std_dev, linear_trend)
-
-    def validate_hour_probabilities(self, hour_probabilities: List[float]):
-        if len(hour_probabilities) != 24:
-            raise ValueError(f"Please provide probabilities for every hour in a day. Got {len(hour_probabilities)}.")
-        
-        Distribution.validate_probabilities({"probabilities": hour_probabilities})
-        
-    def calculate_probabilities(self, hour_probabilities: List[float]) -> List[float]:
-        self.distribution.probabilities = hour_probabilities
-        self.distribution.apply_noise()
-
-        day_hours = {}
-        for i, hour_obj in enumerate(self.generator.hour):
-            day_key = (hour_obj.year, hour_obj.month, hour_obj.day_of_month, hour_obj.day_of_week)
-            if day_key not in day_hours:
-                day_hours[day_key] = []
-            day_hours[day_key].append(self.distribution.probabilities[hour_obj.hour_in_day])
-
-        normalized_probabilities = []
-        for day_key in day_hours:
-            total_day_probability = sum(day_hours[day_key])
-
-            if total_day_probability == 0:
-                normalized_day_probabilities = [1.0 / len(day_hours[day_key])] * len(day_hours[day_key])
-            else:
-                normalized_day_probabilities = [prob / total_day_probability for prob in day_hours[day_key]]
-                normalized_probabilities.extend(normalized_day_probabilities)
-
-        return normalized_probabilities
+    @property
+    def hour_probabilities(self) -> np.ndarray:
+        return self.pipeline.hours["hour_probability"].to_numpy()
     
     def generate_hours(self) -> List[Hour]:
-        hours = []
-        total_order_count = 0
-        remainders = []
-        daily_data = {(day.year, day.month, day.day_of_month, day.day_of_week): day for day in self.daily_distribution.generate_days()}
-
-        for i, hour_obj in enumerate(self.generator.hour):
-            day_info = daily_data[(hour_obj.year, hour_obj.month, hour_obj.day_of_month, hour_obj.day_of_week)]
-            hour_probability = self.hour_probabilities[i % 24]
-            hour_total_orders = day_info.total_orders * hour_probability
-
-            int_orders = int(hour_total_orders)
-            total_order_count += int_orders
-            
-            remainder = hour_total_orders - int_orders
-            remainders.append((remainder, i))
-
-            hour = Hour(
-                year=hour_obj.year,
-                year_probability=day_info.year_probability, 
-                month=hour_obj.month, 
-                month_probability=day_info.month_probability, 
-                day_of_month=hour_obj.day_of_month, 
-                day_of_week=hour_obj.day_of_week, 
-                day_probability=day_info.day_probability, 
-                hour_in_day=hour_obj.hour_in_day, 
-                hour_probability=hour_probability,
-                total_orders=int_orders
-            )
-            hours.append(hour)
-
-        remaining_orders = self.total_orders - total_order_count
-        remainders.sort(reverse=True, key=lambda x: x[0])
-        for _, i in remainders[:remaining_orders]:
-            hours[i].total_orders += 1
-
-        return hours
\ No newline at end of file
+        return [Hour(**row) for row in self.pipeline.hours.iter_rows(named=True)]
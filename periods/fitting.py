@@ -0,0 +1,169 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Union
+from datetime import datetime
+
+import numpy as np
+import polars as pl
+
+from periods.distribution import DistributionPipeline
+from periods.generator import Generator
+
+FIT_ITERATIONS = 5
+TREND_BOUNDS = (-0.95, 10.0)
+TREND_SEARCH_STEPS = 40
+# the streaming engine argument replaced streaming=True in polars 1.25
+STREAMING_ENGINE = tuple(int(part) for part in pl.__version__.split('.')[:2]) >= (1, 25)
+SCANNERS = {'.parquet': pl.scan_parquet, '.csv': pl.scan_csv, '.ipc': pl.scan_ipc, '.arrow': pl.scan_ipc}
+
+class FitResult(BaseModel):
+    start_date: datetime
+    end_date: datetime
+    total_orders: int
+    month_probabilities: List[float]
+    day_of_week_factor: List[float]
+    day_of_month_factor: List[float]
+    hour_probabilities: List[float]
+    linear_trend: float
+    noise_std_dev: Optional[float]
+    diagnostics: Dict[str, float] = Field(default_factory=dict, description="Goodness of fit and data coverage of the estimate")
+
+    def generator_kwargs(self) -> dict:
+        return self.model_dump(exclude={'diagnostics'})
+
+def scan_history(source: Union[str, List[str]]) -> pl.LazyFrame:
+    path = source[0] if isinstance(source, list) else source
+    extension = next((extension for extension in SCANNERS if path.endswith(extension)), None)
+    if extension is None:
+        raise ValueError(f"Please provide {', '.join(SCANNERS)} files. Got {path}.")
+    if extension == '.csv':
+        return pl.scan_csv(source, try_parse_dates=True)
+    return SCANNERS[extension](source)
+
+def hourly_counts(history: pl.LazyFrame, timestamp_col: str, order_id_col: Optional[str] = None) -> pl.DataFrame:
+    timestamp = pl.col(timestamp_col)
+    if history.collect_schema()[timestamp_col] == pl.String:
+        timestamp = timestamp.str.to_datetime()
+
+    # the only pass over the raw rows, it streams down to one row per hour
+    orders = pl.col(order_id_col).n_unique() if order_id_col else pl.len()
+    return (history
+            .group_by(timestamp.cast(pl.Datetime('us')).dt.truncate('1h').alias('hour'))
+            .agg(orders.cast(pl.Int64).alias('orders'), pl.len().alias('rows'))
+            .collect(**({'engine': 'streaming'} if STREAMING_ENGINE else {'streaming': True}))
+            .sort('hour'))
+
+def segment_means(values: np.ndarray, keys: np.ndarray, size: int, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    weights = weights if weights is not None else np.ones(len(values))
+    totals = np.bincount(keys, weights=values * weights, minlength=size)
+    counts = np.bincount(keys, weights=weights, minlength=size)
+    return np.divide(totals, counts, out=np.full(size, np.nan), where=counts > 0)
+
+def expected_month_totals(start_date: datetime, end_date: datetime, total_orders: int,
+                          month_probabilities: np.ndarray, linear_trend: float) -> np.ndarray:
+    # the generator's own noise-free year and month levels, so the trend is fitted where it is applied
+    months = DistributionPipeline(start_date, end_date, total_orders, (month_probabilities / month_probabilities.sum()).tolist(),
+                                  linear_trend=linear_trend).months
+    return total_orders * (months['year_probability'] * months['month_probability']).to_numpy()
+
+def fit_trend(loss) -> float:
+    # golden section search, the loss is smooth and single-dipped over the bounds
+    low, high = TREND_BOUNDS
+    ratio = (np.sqrt(5) - 1) / 2
+    for _ in range(TREND_SEARCH_STEPS):
+        left, right = high - ratio * (high - low), low + ratio * (high - low)
+        if loss(left) <= loss(right):
+            high = right
+        else:
+            low = left
+    return (low + high) / 2
+
+def fit_history(source: Union[str, List[str], pl.LazyFrame], timestamp_col: str = 'order_date',
+                order_id_col: Optional[str] = None) -> FitResult:
+    history = source if isinstance(source, pl.LazyFrame) else scan_history(source)
+    hourly = hourly_counts(history, timestamp_col, order_id_col)
+    if hourly.is_empty():
+        raise ValueError("The order history is empty.")
+
+    hours = hourly['hour'].to_numpy().astype('datetime64[h]')
+    first_day, last_day = hours[0].astype('datetime64[D]'), hours[-1].astype('datetime64[D]')
+    start_date, end_date = first_day.astype('datetime64[us]').item(), last_day.astype('datetime64[us]').item()
+    calendar = Generator(start_date, end_date, 0)
+    days, months = calendar.day, calendar.month
+
+    counts = np.zeros(24 * len(days))
+    counts[(hours - first_day.astype('datetime64[h]')).astype(np.int64)] = hourly['orders'].to_numpy()
+    by_hour = counts.reshape(len(days), 24)
+    daily = by_hour.sum(axis=1)
+    total_orders = int(daily.sum())
+
+    hour_probabilities = by_hour.sum(axis=0) / total_orders
+
+    # month seasonality and the linear trend, fitted alternately against the generator's year x month totals
+    month_totals = np.add.reduceat(daily, days.offsets[:-1])
+    month_index = months.month.astype(np.int64) - 1
+    observed_months = np.bincount(month_index, minlength=12) > 0
+    month_probabilities, trend = np.full(12, 1.0 / 12), 0.0
+
+    def expected(month_probabilities: np.ndarray, trend: float) -> np.ndarray:
+        return expected_month_totals(start_date, end_date, total_orders, month_probabilities, trend)
+
+    def loss(trend: float) -> float:
+        expected_totals = expected(month_probabilities, trend)
+        return float(np.sum((month_totals - expected_totals) ** 2 / np.maximum(expected_totals, 1.0)))
+
+    for _ in range(FIT_ITERATIONS):
+        for _ in range(FIT_ITERATIONS):
+            expected_by_month = np.bincount(month_index, expected(month_probabilities, trend), 12)
+            ratios = np.divide(np.bincount(month_index, month_totals, 12), expected_by_month, out=np.ones(12), where=expected_by_month > 0)
+            month_probabilities = np.where(observed_months, month_probabilities * ratios, 0.0)
+            month_probabilities = month_probabilities / month_probabilities.sum()
+        if len(months) > 1:
+            trend = fit_trend(loss)
+    month_probabilities = np.where(observed_months, month_probabilities, month_probabilities[observed_months].mean())
+    month_probabilities = month_probabilities / month_probabilities.sum()
+    expected_totals = expected(month_probabilities, trend)
+
+    # day of week and day of month multipliers relative to the month's fitted daily rate
+    base = (expected_totals / months.days)[days.parent_index]
+    day_of_week_factor, day_of_month_factor = np.ones(7), np.ones(31)
+    ratios = np.divide(daily, base, out=np.ones(len(daily)), where=base > 0)
+    for _ in range(FIT_ITERATIONS):
+        day_of_week_factor = segment_means(ratios / day_of_month_factor[days.day_of_month - 1], days.day_of_week.astype(np.int64), 7)
+        day_of_week_factor = np.nan_to_num(day_of_week_factor / np.nanmean(day_of_week_factor), nan=1.0)
+        day_of_month_factor = segment_means(ratios / day_of_week_factor[days.day_of_week], days.day_of_month.astype(np.int64) - 1, 31)
+        day_of_month_factor = np.nan_to_num(day_of_month_factor / np.nanmean(day_of_month_factor), nan=1.0)
+
+    # multiplicative noise is what the residual spread leaves after Poisson sampling noise
+    fitted = base * day_of_week_factor[days.day_of_week] * day_of_month_factor[days.day_of_month - 1]
+    fitted *= daily.sum() / fitted.sum()
+    observed = fitted > 0
+    residuals = daily[observed] / fitted[observed]
+    poisson_variance = np.mean(1 / fitted[observed])
+    noise_variance = max(np.var(residuals) - poisson_variance, 0.0)
+    noise_std_dev = float(np.sqrt(noise_variance)) if noise_variance > 0 else None
+
+    total_variance = np.var(daily)
+    year_totals, expected_year_totals = months.segment_sum(month_totals), months.segment_sum(expected_totals)
+    return FitResult(
+        start_date=start_date,
+        end_date=end_date,
+        total_orders=total_orders,
+        month_probabilities=month_probabilities.tolist(),
+        day_of_week_factor=day_of_week_factor.tolist(),
+        day_of_month_factor=day_of_month_factor.tolist(),
+        hour_probabilities=hour_probabilities.tolist(),
+        linear_trend=float(trend),
+        noise_std_dev=noise_std_dev,
+        diagnostics={
+            'rows': float(hourly['rows'].sum()),
+            'orders': float(total_orders),
+            'days': float(len(days)),
+            'months_observed': float(len(np.unique(month_index))),
+            'empty_days': float((daily == 0).sum()),
+            'daily_r2': float(1 - np.var(daily - fitted) / total_variance) if total_variance > 0 else 1.0,
+            'residual_std': float(np.std(residuals)),
+            'year_total_error': float(np.max(np.abs(expected_year_totals / np.maximum(year_totals, 1) - 1))),
+            'month_total_error': float(np.max(np.abs(expected_totals / np.maximum(month_totals, 1) - 1))),
+            'poisson_std': float(np.sqrt(poisson_variance)),
+        },
+    )
@@ -1,54 +1,111 @@
-from periods.noiser import Noiser
-from periods.schemas import Hour, Day, Month, Year
+import numpy as np
 
-from pydantic import ValidationError, BaseModel
-from typing import List, Union, Any, Type
+from typing import Optional
+from functools import cached_property
 
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from periods.profiling import Profiler, profile_stage
+
+
+class Periods:
+    def __init__(self, start: np.ndarray, end: np.ndarray, offsets: Optional[np.ndarray] = None):
+        self.start = start
+        self.end = end
+
+        days = start.astype('datetime64[D]')
+        self.year = days.astype('datetime64[Y]').astype(np.int32) + 1970
+        self.month = (days.astype('datetime64[M]').astype(np.int32) % 12 + 1).astype(np.int8)
+        self.day_of_month = ((days - days.astype('datetime64[M]')).astype(np.int32) + 1).astype(np.int8)
+        # 1970-01-01 was a Thursday, weekday() == 3
+        self.day_of_week = ((days.astype(np.int64) + 3) % 7).astype(np.int8)
+        self.hour_in_day = (start - days).astype('timedelta64[h]').astype(np.int8)
+
+        self.offsets = offsets if offsets is not None else np.array([0, len(start)], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @property
+    def days(self) -> np.ndarray:
+        return (self.end.astype('datetime64[D]') - self.start.astype('datetime64[D]')).astype(np.int64)
+
+    @cached_property
+    def parent_index(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+
+    def segment_sum(self, values: np.ndarray) -> np.ndarray:
+        if not values.shape[-1]:
+            return np.zeros(values.shape[:-1] + (0,))
+        return np.add.reduceat(values, self.offsets[:-1], axis=-1)
+
+    def normalize(self, values: np.ndarray) -> np.ndarray:
+        totals = self.segment_sum(values)[..., self.parent_index]
+        uniform = np.broadcast_to(1.0 / np.diff(self.offsets)[self.parent_index], values.shape).copy()
+        return np.divide(values, totals, out=uniform, where=totals != 0)
+
+
+def segment_offsets(keys: np.ndarray) -> np.ndarray:
+    boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    return np.concatenate(([0], boundaries, [len(keys)])).astype(np.int64)
 
 
 class Generator:
-    def __init__(self, start_date: datetime, end_date: datetime, total_orders: int):
+    def __init__(self, start_date: datetime, end_date: datetime, total_orders: int, 
+                 profiler: Optional[Profiler] = None):
         self.start_date = start_date
         self.end_date = end_date
         self.total_orders = total_orders
+        self.profiler = profiler
+
+        self.first_day = np.datetime64(start_date.date(), 'D')
+        self.last_day = np.datetime64(end_date.date(), 'D')
+        if self.last_day < self.first_day:
+            raise ValueError(f"end_date {end_date} is before start_date {start_date}.")
+
+    @cached_property
+    def year(self) -> Periods:
+        return self.generate_periods('Y')
+
+    @cached_property
+    def month(self) -> Periods:
+        return self.generate_periods('M')
+
+    @cached_property
+    def day(self) -> Periods:
+        return self.generate_periods('D')
 
-        self.year: List[Year] = self.generate_periods(Year)
-        self.month: List[Month] = self.generate_periods(Month)
-        self.day: List[Day] = self.generate_periods(Day)
-        self.hour: List[Hour] = self.generate_periods(Hour)
-
-    def generate_periods(self, period_class: Type[Year] | Type[Month] | Type[Day] | Type[Hour]) -> List[Year | Month | Day | Hour]:
-        periods = []
-        current_date = self.start_date
-        
-        while current_date <= self.end_date:
-            if period_class == Year:
-                period = period_class(year=current_date.year)
-            elif period_class == Month:
-                period = period_class(year=current_date.year, month=current_date.month)
-            elif period_class == Day:
-                period = period_class(year=current_date.year, month=current_date.month, day_of_month=current_date.day, day_of_week=current_date.weekday())
-            elif period_class == Hour:
-                for hour_in_day in range(24):
-                    period = period_class(year=current_date.year, month=current_date.month, day_of_month=current_date.day, day_of_week=current_date.weekday(), hour_in_day=hour_in_day)
-                    periods.append(period)
-                current_date += timedelta(days=1)
-                continue
-            else:
-                raise ValueError(f"Unsupported period class: {period_class}")
-            
-            periods.append(period)
-            
-            if period_class == Year:
-                current_date = datetime(current_date.year + 1, 1, 1)
-            elif period_class == Month:
-                if current_date.month == 12:
-                    current_date = datetime(current_date.year + 1, 1, 1)
-                else:
-                    current_date = datetime(current_date.year, current_date.month + 1, 1)
-            elif period_class == Day:
-                current_date += timedelta(days=1)
-        
+    @cached_property
+    def hour(self) -> Periods:
+        days = self.day.start
+        with profile_stage(self.profiler, 'calendar') as stage:
+            start = (np.repeat(days, 24).astype('datetime64[h]')
+                     + np.tile(np.arange(24, dtype=np.int64), len(days)).astype('timedelta64[h]'))
+            offsets = np.arange(0, 24 * len(days) + 1, 24, dtype=np.int64)
+            stage.rows = len(start)
+            return Periods(start, start + np.timedelta64(1, 'h'), offsets)
+
+    def generate_periods(self, unit: str) -> Periods:
+        if unit not in ('Y', 'M', 'D'):
+            raise ValueError(f"Unsupported period unit: {unit}")
+
+        with profile_stage(self.profiler, 'calendar') as stage:
+            periods = self.build_periods(unit)
+            stage.rows = len(periods)
         return periods
 
+    def build_periods(self, unit: str) -> Periods:
+        first = self.first_day.astype(f'datetime64[{unit}]')
+        last = self.last_day.astype(f'datetime64[{unit}]')
+        period_starts = np.arange(first, last + 1).astype('datetime64[D]')
+        period_ends = (np.arange(first, last + 1) + 1).astype('datetime64[D]')
+
+        start = np.maximum(period_starts, self.first_day)
+        end = np.minimum(period_ends, self.last_day + 1)
+
+        periods = Periods(start, end)
+        if unit == 'M':
+            periods.offsets = segment_offsets(periods.year)
+        elif unit == 'D':
+            periods.offsets = segment_offsets(periods.year * 12 + periods.month)
+        return periods
@@ -0,0 +1,23 @@
+import numpy as np
+from typing import List, Optional
+
+MINUTES_IN_HOUR = 60
+MICROSECONDS_IN_MINUTE = 60_000_000
+MICROSECONDS_IN_HOUR = MINUTES_IN_HOUR * MICROSECONDS_IN_MINUTE
+
+def validate_minute_probabilities(minute_probabilities: List[float]):
+    if len(minute_probabilities) != MINUTES_IN_HOUR:
+        raise ValueError(f"Please provide probabilities for every minute in an hour. Got {len(minute_probabilities)}.")
+    if not (0.999 <= sum(minute_probabilities) <= 1.001):
+        raise ValueError("The sum of probabilities must be 1.")
+
+def draw_minute_offsets(count: int,
+                        minute_probabilities: Optional[List[float]] = None,
+                        rng=np.random) -> np.ndarray:
+    minutes = rng.choice(MINUTES_IN_HOUR, size=count, p=minute_probabilities, replace=True)
+    return minutes * MICROSECONDS_IN_MINUTE + (rng.random(count) * MICROSECONDS_IN_MINUTE).astype(np.int64)
+
+def sort_hour_offsets(order_periods: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    # order_periods is non-decreasing, so one sort orders the offsets inside every hour
+    period_starts = order_periods.astype(np.int64) * MICROSECONDS_IN_HOUR
+    return np.sort(period_starts + offsets) - period_starts
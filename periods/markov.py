@@ -0,0 +1,119 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+
+import numpy as np
+
+MARKOV_LEVELS = ('day', 'hour')
+BURN_IN_STEPS = 256
+
+def impulse_response(coefficients: np.ndarray, steps: int) -> np.ndarray:
+    response = np.zeros(steps)
+    response[0] = 1.0
+    for t in range(1, steps):
+        lags = min(t, len(coefficients))
+        response[t] = np.dot(coefficients[:lags], response[t - 1::-1][:lags])
+    return response
+
+def simulate_ar(coefficients: List[float], innovations: np.ndarray, block_size: int = 256) -> np.ndarray:
+    coefficients = np.asarray(coefficients, dtype=float)
+    order = len(coefficients)
+    paths, steps = innovations.shape
+    if order == 0 or steps == 0:
+        return innovations.copy()
+
+    block_size = max(block_size, order)
+    response = impulse_response(coefficients, block_size)
+    lags = np.arange(block_size)[:, None] - np.arange(block_size)[None, :]
+    zero_state = np.where(lags >= 0, response[np.clip(lags, 0, None)], 0.0)
+
+    # response of one block to its p preceding values, column j is lag j + 1
+    initial_state = np.zeros((block_size + order, order))
+    initial_state[:order, :] = np.eye(order)[::-1]
+    for t in range(order, block_size + order):
+        initial_state[t] = coefficients @ initial_state[t - order:t][::-1]
+    initial_state = initial_state[order:]
+
+    blocks = -(-steps // block_size)
+    padded = np.zeros((paths, blocks * block_size))
+    padded[:, :steps] = innovations
+    values = (padded.reshape(paths, blocks, block_size) @ zero_state.T)
+
+    state = np.zeros((paths, order))
+    for block in range(blocks):
+        values[:, block] += state @ initial_state.T
+        state = values[:, block, :-order - 1:-1]
+
+    return values.reshape(paths, -1)[:, :steps]
+
+def stationary_distribution(transitions: np.ndarray) -> np.ndarray:
+    eigenvalues, eigenvectors = np.linalg.eig(transitions.T)
+    stationary = np.abs(np.real(eigenvectors[:, np.argmin(np.abs(eigenvalues - 1))]))
+    return stationary / stationary.sum()
+
+def simulate_regimes(transitions: np.ndarray, steps: int, paths: int = 1, rng=np.random) -> np.ndarray:
+    regime_count = len(transitions)
+    stay = np.diag(transitions)
+    jumps = transitions * (1 - np.eye(regime_count))
+    jump_totals = jumps.sum(axis=1, keepdims=True)
+    jumps = np.divide(jumps, jump_totals, out=np.full_like(jumps, 1.0 / max(regime_count - 1, 1)), where=jump_totals > 0)
+    cumulative_jumps = np.cumsum(jumps, axis=1)
+
+    cumulative_stationary = np.cumsum(stationary_distribution(transitions))
+    regimes = np.minimum(np.searchsorted(cumulative_stationary, rng.random(paths) * cumulative_stationary[-1]), regime_count - 1)
+
+    # one vectorized draw per regime switch across all paths instead of one per step
+    visited, durations = [], []
+    covered = np.zeros(paths, dtype=np.int64)
+    while (covered < steps).any():
+        leave = 1.0 - stay[regimes]
+        duration = np.where(leave > 0, rng.geometric(np.clip(leave, 1e-12, 1.0)), steps)
+        visited.append(regimes)
+        durations.append(duration)
+        covered += duration
+        next_regimes = (rng.random(paths)[:, None] > cumulative_jumps[regimes]).sum(axis=1)
+        regimes = np.minimum(next_regimes, regime_count - 1)
+
+    ends = np.minimum(np.cumsum(np.stack(durations, axis=1), axis=1), steps)
+    lengths = np.diff(ends, axis=1, prepend=0)
+    return np.repeat(np.stack(visited, axis=1).ravel(), lengths.ravel()).reshape(paths, steps)
+
+class MarkovProcess(BaseModel):
+    level: str = Field('day', description="Distribution level the process is applied to ('day' or 'hour')")
+    ar_coefficients: List[float] = Field(default_factory=list, description="AR(p) coefficients of the log-intensity, lag 1 first")
+    noise_std_dev: float = Field(0.1, description="Standard deviation of the AR innovations")
+    regime_levels: Optional[List[float]] = Field(None, description="Intensity multiplier of every regime")
+    regime_transitions: Optional[List[List[float]]] = Field(None, description="Row-stochastic regime transition matrix")
+
+    @model_validator(mode='after')
+    def validate_process(self):
+        if self.level not in MARKOV_LEVELS:
+            raise ValueError(f"Invalid Markov level. Choose from {', '.join(MARKOV_LEVELS)}. Got {self.level}.")
+
+        if self.ar_coefficients:
+            order = len(self.ar_coefficients)
+            companion = np.eye(order, k=-1)
+            companion[0] = self.ar_coefficients
+            if np.max(np.abs(np.linalg.eigvals(companion))) >= 1:
+                raise ValueError("The AR coefficients must describe a stationary process.")
+
+        if (self.regime_levels is None) != (self.regime_transitions is None):
+            raise ValueError("Please provide both regime_levels and regime_transitions.")
+        if self.regime_transitions is not None:
+            transitions = np.asarray(self.regime_transitions, dtype=float)
+            if transitions.shape != (len(self.regime_levels), len(self.regime_levels)):
+                raise ValueError(f"Please provide a {len(self.regime_levels)}x{len(self.regime_levels)} regime transition matrix. Got {transitions.shape}.")
+            if not np.allclose(transitions.sum(axis=1), 1.0, atol=1e-3):
+                raise ValueError("Every row of regime_transitions must sum to 1.")
+
+        return self
+
+    def simulate(self, steps: int, paths: int = 1, rng=np.random) -> np.ndarray:
+        burn_in = BURN_IN_STEPS if self.ar_coefficients else 0
+        innovations = rng.normal(0.0, self.noise_std_dev, (paths, steps + burn_in))
+        multipliers = np.exp(simulate_ar(self.ar_coefficients, innovations)[:, burn_in:])
+
+        if self.regime_transitions is not None:
+            regimes = simulate_regimes(np.asarray(self.regime_transitions, dtype=float), steps, paths, rng)
+            multipliers *= np.asarray(self.regime_levels, dtype=float)[regimes]
+
+        return multipliers
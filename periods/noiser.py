@@ -1,12 +1,55 @@
 import numpy as np
-from typing import List
+from typing import List, Optional, Tuple
+
+def derive_rng(seed: Optional[int], key: Tuple[int, ...]):
+    if seed is None:
+        return np.random
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=key))
+
+class RowStreams:
+    # one generator per leading row, so a row's draws do not depend on how many rows are drawn together
+    def __init__(self, rngs: List[np.random.Generator]):
+        self.rngs = rngs
+
+    def __len__(self) -> int:
+        return len(self.rngs)
+
+    def spawn(self) -> "RowStreams":
+        return RowStreams([rng.spawn(1)[0] for rng in self.rngs])
+
+    def stacked(self, count: int, draw) -> np.ndarray:
+        if count % len(self.rngs):
+            raise ValueError(f"Please draw a multiple of {len(self.rngs)} rows. Got {count}.")
+        rows = count // len(self.rngs)
+        return np.concatenate([draw(rng, slice(index * rows, (index + 1) * rows)) for index, rng in enumerate(self.rngs)])
+
+    def normal(self, loc: float = 0.0, scale: float = 1.0, size=None) -> np.ndarray:
+        size = tuple(np.atleast_1d(size))
+        return self.stacked(size[0], lambda rng, rows: rng.normal(loc, scale, (rows.stop - rows.start, *size[1:])))
+
+    def random(self, size=None) -> np.ndarray:
+        size = tuple(np.atleast_1d(size))
+        return self.stacked(size[0], lambda rng, rows: rng.random((rows.stop - rows.start, *size[1:])))
+
+    def geometric(self, p: np.ndarray) -> np.ndarray:
+        p = np.asarray(p)
+        return self.stacked(len(p), lambda rng, rows: rng.geometric(p[rows]))
+
+    def binomial(self, n: np.ndarray, p: np.ndarray) -> np.ndarray:
+        n, p = np.broadcast_arrays(n, p)
+        return self.stacked(len(n), lambda rng, rows: rng.binomial(n[rows], p[rows]))
 
 class Noiser:
-    def __init__(self, noise_std_dev: float = 0.05):
+    def __init__(self, noise_std_dev: float = 0.05, rng: Optional[np.random.Generator] = None):
         self.noise_std_dev = noise_std_dev
+        self.rng = rng if rng is not None else np.random
 
     def apply_noise(self, probabilities: List[float]) -> List[float]:
-        noise = np.random.normal(1, self.noise_std_dev, len(probabilities))
+        # heavy noise would otherwise turn probabilities negative
+        noise = np.maximum(self.rng.normal(1, self.noise_std_dev, len(probabilities)), 0.0)
         noisy_probabilities = np.array(probabilities) * noise
-        normalized_probabilities = noisy_probabilities / np.sum(noisy_probabilities)
-        return normalized_probabilities
\ No newline at end of file
+        total = np.sum(noisy_probabilities)
+        if total <= 0:
+            return np.full(len(noisy_probabilities), 1.0 / len(noisy_probabilities))
+        normalized_probabilities = noisy_probabilities / total
+        return normalized_probabilities
@@ -0,0 +1,136 @@
+import numpy as np
+import polars as pl
+
+import seaborn as sns
+import matplotlib.pyplot as plt
+
+from typing import Tuple
+
+PLOT_KINDS = ('auto', 'bar', 'line', 'heatmap', 'months')
+DOWNSAMPLING_METHODS = ('envelope', 'lttb')
+MAX_BARS = 60
+DAY_OF_WEEK_LABELS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+MONTH_LABELS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+def period_starts(distribution: pl.DataFrame, distribution_type: str) -> np.ndarray:
+    years = distribution['year'].to_numpy().astype(np.int64) - 1970
+    if distribution_type == 'year':
+        return years.astype('datetime64[Y]')
+
+    starts = (years * 12 + distribution['month'].to_numpy() - 1).astype('datetime64[M]')
+    if distribution_type == 'month':
+        return starts
+
+    starts = starts.astype('datetime64[D]') + (distribution['day_of_month'].to_numpy().astype(np.int64) - 1)
+    if distribution_type == 'day':
+        return starts
+    return starts.astype('datetime64[h]') + distribution['hour_in_day'].to_numpy().astype(np.int64)
+
+def min_max_envelope(y: np.ndarray, buckets: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    edges = np.unique(np.linspace(0, len(y), min(buckets, len(y)) + 1).astype(np.int64))[:-1]
+    means = np.add.reduceat(y, edges) / np.diff(np.append(edges, len(y)))
+    return edges, means, np.minimum.reduceat(y, edges), np.maximum.reduceat(y, edges)
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    count = len(x)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    # largest triangle three buckets: the loop runs once per output point, not per period
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_x, next_y = x[end:edges[bucket + 2]].mean(), y[end:edges[bucket + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        previous_x, previous_y = x[selected[bucket]], y[selected[bucket]]
+        areas = np.abs((previous_x - next_x) * (y[start:end] - previous_y) - (previous_x - x[start:end]) * (next_y - previous_y))
+        selected[bucket + 1] = start + np.argmax(areas)
+    return selected
+
+def plot_orders_cumulated(distribution: pl.DataFrame, distribution_type: str, kind: str = 'auto',
+                          max_points: int = 2000, downsample: str = 'envelope'):
+    if distribution_type == 'year':
+        x_label = 'Year'
+    elif distribution_type == 'month':
+        x_label = 'Year-Month'
+    elif distribution_type == 'day':
+        x_label = 'Year-Month-Day'
+    elif distribution_type == 'hour':
+        x_label = 'Year-Month-Day-Hour'
+    else:
+        raise ValueError("Invalid distribution type. Choose from 'year', 'month', 'day', 'hour'.")
+    if kind not in PLOT_KINDS:
+        raise ValueError(f"Invalid plot kind. Choose from {', '.join(PLOT_KINDS)}. Got {kind}.")
+    if downsample not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Invalid downsampling method. Choose from {', '.join(DOWNSAMPLING_METHODS)}. Got {downsample}.")
+
+    if kind == 'auto':
+        kind = 'bar' if len(distribution) <= MAX_BARS else 'line'
+    if kind == 'heatmap':
+        return plot_heatmap(distribution, distribution_type)
+    if kind == 'months':
+        return plot_months(distribution, distribution_type)
+
+    starts = period_starts(distribution, distribution_type)
+    total_orders = distribution['total_orders'].to_numpy().astype(float)
+    if kind == 'bar':
+        if len(distribution) > max_points:
+            raise ValueError(f"A bar plot of {len(distribution)} periods is unreadable, use kind='line' or raise max_points.")
+        sns.barplot(x=np.datetime_as_string(starts), y=total_orders)
+        plt.xticks(rotation=45)
+    elif downsample == 'lttb':
+        selected = lttb(starts.astype(np.int64).astype(float), total_orders, max_points)
+        plt.plot(starts[selected], total_orders[selected])
+    else:
+        edges, means, lows, highs = min_max_envelope(total_orders, max_points)
+        plt.fill_between(starts[edges], lows, highs, alpha=0.3, step='post', label='min-max')
+        plt.plot(starts[edges], means, drawstyle='steps-post', label='mean')
+        if len(edges) < len(starts):
+            plt.legend()
+
+    plt.xlabel(x_label)
+    plt.ylabel('Total Orders')
+    plt.title(f'Total Orders by {x_label}')
+    plt.show()
+
+def plot_heatmap(distribution: pl.DataFrame, distribution_type: str):
+    if distribution_type != 'hour':
+        raise ValueError(f"The day of week x hour heatmap needs the 'hour' distribution. Got {distribution_type}.")
+
+    cells = distribution['day_of_week'].to_numpy().astype(np.int64) * 24 + distribution['hour_in_day'].to_numpy()
+    totals = np.bincount(cells, weights=distribution['total_orders'].to_numpy(), minlength=7 * 24).reshape(7, 24)
+    sns.heatmap(totals, yticklabels=DAY_OF_WEEK_LABELS, cmap='viridis', cbar_kws={'label': 'Total Orders'})
+    plt.xlabel('Hour')
+    plt.ylabel('Day of Week')
+    plt.title('Total Orders by Day of Week and Hour')
+    plt.show()
+
+def plot_months(distribution: pl.DataFrame, distribution_type: str):
+    if distribution_type not in ('day', 'hour'):
+        raise ValueError(f"Per-month small multiples need the 'day' or 'hour' distribution. Got {distribution_type}.")
+
+    days = (distribution.group_by(['year', 'month', 'day_of_month'], maintain_order=True)
+            .agg(pl.col('total_orders').sum()))
+    years = days['year'].to_numpy().astype(np.int64)
+    first_year = years.min()
+    grid = np.full((12, years.max() - first_year + 1, 31), np.nan)
+    grid[days['month'].to_numpy() - 1, years - first_year, days['day_of_month'].to_numpy() - 1] = days['total_orders'].to_numpy()
+
+    figure, axes = plt.subplots(3, 4, sharex=True, sharey=True, figsize=(16, 9))
+    day_numbers = np.arange(1, 32)
+    for month, axis in enumerate(axes.ravel()):
+        observed = ~np.isnan(grid[month]).all(axis=0)
+        if observed.any():
+            values = grid[month][:, observed]
+            axis.fill_between(day_numbers[observed], np.nanmin(values, axis=0), np.nanmax(values, axis=0), alpha=0.3)
+            axis.plot(day_numbers[observed], np.nanmean(values, axis=0))
+        axis.set_title(MONTH_LABELS[month])
+
+    figure.supxlabel('Day of Month')
+    figure.supylabel('Total Orders')
+    figure.suptitle('Total Orders per Day, mean and min-max across years')
+    plt.show()
@@ -0,0 +1,123 @@
+import time
+import tracemalloc
+
+import polars as pl
+
+from pydantic import BaseModel, Field
+from typing import Callable, List, Optional
+
+PROFILE_STAGES = ('calendar', 'probabilities', 'noise', 'apportionment', 'item_sampling', 'customers', 'assembly')
+
+class StageRecord(BaseModel):
+    stage: str = Field(..., description="Name of the profiled stage")
+    seconds: float = Field(..., description="Wall time spent in the stage, excluding nested stages")
+    rows: int = Field(0, description="Number of rows (periods, items or orders) the stage produced")
+    peak_bytes: Optional[int] = Field(None, description="Peak traced allocation above the stage's starting memory")
+
+class RunStats:
+    def __init__(self, records: Optional[List[StageRecord]] = None):
+        self.records = list(records) if records else []
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(record.seconds for record in self.records)
+
+    def to_frame(self) -> pl.DataFrame:
+        records = pl.DataFrame([record.model_dump() for record in self.records], 
+                               schema={'stage': pl.String, 'seconds': pl.Float64, 'rows': pl.Int64, 'peak_bytes': pl.Int64})
+        order = pl.DataFrame({'stage': list(PROFILE_STAGES), 'order': range(len(PROFILE_STAGES))})
+        return (records.group_by('stage')
+                .agg(pl.len().alias('calls'), pl.col('seconds').sum(), pl.col('rows').sum(), pl.col('peak_bytes').max())
+                .join(order, on='stage', how='left')
+                .sort('order', nulls_last=True)
+                .drop('order'))
+
+class Stage:
+    __slots__ = ('profiler', 'name', 'rows', 'started', 'start_memory', 'peak_memory', 'nested_seconds')
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.rows = 0
+        self.nested_seconds = 0.0
+
+    def __enter__(self) -> "Stage":
+        self.profiler.enter(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.exit(self)
+
+class NullStage:
+    __slots__ = ('rows',)
+
+    def __enter__(self) -> "NullStage":
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+NULL_STAGE = NullStage()
+
+class Profiler:
+    def __init__(self, callback: Optional[Callable[[StageRecord], None]] = None, track_memory: bool = False):
+        self.callback = callback
+        self.track_memory = track_memory
+        self.records: List[StageRecord] = []
+        self.stack: List[Stage] = []
+        self.started_tracing = False
+
+    def __getstate__(self):
+        # worker processes get a blank profiler and hand their records back to be merged
+        return {'callback': None, 'track_memory': self.track_memory, 'records': [], 'stack': [], 'started_tracing': False}
+
+    def stage(self, name: str) -> Stage:
+        return Stage(self, name)
+
+    def enter(self, stage: Stage):
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            if self.stack:
+                self.stack[-1].peak_memory = max(self.stack[-1].peak_memory, peak)
+            tracemalloc.reset_peak()
+            stage.start_memory = stage.peak_memory = current
+        self.stack.append(stage)
+        stage.started = time.perf_counter()
+
+    def exit(self, stage: Stage):
+        elapsed = time.perf_counter() - stage.started
+        self.stack.pop()
+        peak_bytes = None
+        if self.track_memory:
+            stage.peak_memory = max(stage.peak_memory, tracemalloc.get_traced_memory()[1])
+            peak_bytes = stage.peak_memory - stage.start_memory
+        if self.stack:
+            self.stack[-1].nested_seconds += elapsed
+            if self.track_memory:
+                self.stack[-1].peak_memory = max(self.stack[-1].peak_memory, stage.peak_memory)
+        elif self.started_tracing:
+            # tracing slows every allocation, so it only runs while this profiler's outermost stage is open
+            tracemalloc.stop()
+            self.started_tracing = False
+
+        self.record(StageRecord(stage=stage.name, seconds=elapsed - stage.nested_seconds, 
+                                rows=stage.rows, peak_bytes=peak_bytes))
+
+    def record(self, record: StageRecord):
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def merge(self, records: List[StageRecord]):
+        for record in records:
+            self.record(record)
+
+    @property
+    def stats(self) -> RunStats:
+        return RunStats(self.records)
+
+def profile_stage(profiler: Optional[Profiler], name: str):
+    return profiler.stage(name) if profiler is not None else NULL_STAGE
@@ -0,0 +1,66 @@
+from typing import List, Optional
+from datetime import datetime
+
+import numpy as np
+import polars as pl
+
+from periods.markov import MarkovProcess
+from periods.noiser import RowStreams, derive_rng
+from periods.stores import StoreDistributionPipeline
+
+SCENARIO_TIME_COLS = {
+    'year': ['year'],
+    'month': ['year', 'month'],
+    'day': ['year', 'month', 'day_of_month', 'day_of_week'],
+    'hour': ['year', 'month', 'day_of_month', 'day_of_week', 'hour_in_day'],
+}
+
+def scenario_counts(start_date: datetime, 
+                    end_date: datetime, 
+                    total_orders: int, 
+                    distribution_type: str,
+                    scenarios: int,
+                    month_probabilities: List[float], 
+                    day_of_week_factor: List[float], 
+                    day_of_month_factor: List[float], 
+                    hour_probabilities: List[float], 
+                    linear_trend: float = 0.0,
+                    noise_std_dev: Optional[float] = None,
+                    seed: Optional[int] = None,
+                    apportionment: str = 'largest_remainder',
+                    markov: Optional[MarkovProcess] = None,
+                    batch_size: int = 1000) -> np.ndarray:
+
+    if distribution_type not in SCENARIO_TIME_COLS:
+        raise ValueError("Invalid distribution type. Choose from 'year', 'month', 'day', 'hour'.")
+    if scenarios < 1 or batch_size < 1:
+        raise ValueError(f"scenarios and batch_size must be positive integers. Got {scenarios} and {batch_size}.")
+
+    # every scenario is a copy of the same store with its own stream, batches only bound the size of the intermediate matrices
+    counts = None
+    for first in range(0, scenarios, batch_size):
+        size = min(batch_size, scenarios - first)
+        stores = pl.DataFrame({
+            'store_id': np.arange(first, first + size),
+            'total_orders': np.full(size, total_orders),
+            'month_probabilities': [month_probabilities] * size,
+            'day_of_week_factor': [day_of_week_factor] * size,
+            'day_of_month_factor': [day_of_month_factor] * size,
+            'hour_probabilities': [hour_probabilities] * size,
+            'linear_trend': np.full(size, linear_trend),
+        })
+        rng = RowStreams([derive_rng(seed, (2, scenario)) for scenario in range(first, first + size)]) if seed is not None else None
+        pipeline = StoreDistributionPipeline(start_date, end_date, stores, noise_std_dev, rng, apportionment, markov=markov)
+        batch_counts = pipeline.counts(distribution_type)
+        if counts is None:
+            counts = np.empty((scenarios, batch_counts.shape[1]), dtype=np.int32 if total_orders < 2**31 else np.int64)
+        counts[first:first + size] = batch_counts
+    return counts
+
+def scenario_quantiles(periods, distribution_type: str, counts: np.ndarray, quantiles: List[float]) -> pl.DataFrame:
+    values = np.quantile(counts, quantiles, axis=0)
+    return pl.DataFrame({
+        **{col: getattr(periods, col) for col in SCENARIO_TIME_COLS[distribution_type]},
+        'total_orders_mean': counts.mean(axis=0),
+        **{f"total_orders_p{quantile * 100:g}": value for quantile, value in zip(quantiles, values)},
+    })
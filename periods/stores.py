@@ -0,0 +1,215 @@
+from typing import List, Optional
+from functools import cached_property
+from datetime import datetime
+
+import numpy as np
+import polars as pl
+
+from periods.apportion import APPORTIONMENT_METHODS, apportion
+from periods.distribution import DISTRIBUTION_TYPES
+from periods.generator import Generator, Periods
+from periods.markov import MarkovProcess
+from periods.noiser import RowStreams
+from periods.profiling import Profiler, profile_stage
+
+STORE_PARAMETERS = {
+    'month_probabilities': (12, 1.0 / 12),
+    'day_of_week_factor': (7, 1.0),
+    'day_of_month_factor': (31, 1.0),
+    'hour_probabilities': (24, 1.0 / 24),
+}
+
+def store_parameter(stores: pl.DataFrame, col: str) -> np.ndarray:
+    length, default = STORE_PARAMETERS[col]
+    if col not in stores.columns:
+        return np.full((len(stores), length), default)
+
+    values = stores[col].fill_null([default] * length).to_list()
+    if any(len(row) != length for row in values):
+        raise ValueError(f"Please provide {length} values of {col} for every store.")
+    return np.asarray(values, dtype=float)
+
+class StoreDistributionPipeline:
+    def __init__(self, start_date: datetime, 
+                 end_date: datetime, 
+                 stores: pl.DataFrame, 
+                 noise_std_dev: Optional[float] = None,
+                 rng: Optional[np.random.Generator] = None,
+                 apportionment: str = 'largest_remainder',
+                 profiler: Optional[Profiler] = None,
+                 markov: Optional[MarkovProcess] = None):
+
+        if 'store_id' not in stores.columns or 'total_orders' not in stores.columns:
+            raise ValueError("Please provide a stores table with store_id and total_orders columns.")
+        if stores['store_id'].n_unique() != len(stores):
+            raise ValueError("Every store_id must be unique.")
+
+        self.store_ids = stores['store_id']
+        self.total_orders = stores['total_orders'].to_numpy().astype(np.int64)
+        self.generator = Generator(start_date, end_date, int(self.total_orders.sum()), profiler)
+        self.month_probabilities = store_parameter(stores, 'month_probabilities')
+        self.day_of_week_factor = store_parameter(stores, 'day_of_week_factor')
+        self.day_of_month_factor = store_parameter(stores, 'day_of_month_factor')
+        self.hour_probabilities = store_parameter(stores, 'hour_probabilities')
+        self.linear_trend = (stores['linear_trend'].fill_null(0.0).to_numpy().astype(float) 
+                             if 'linear_trend' in stores.columns else np.zeros(len(stores)))
+        self.noise_std_dev = noise_std_dev
+        self.rng = rng if rng is not None else np.random
+        self.apportionment = apportionment
+        self.profiler = profiler
+        self.markov = markov
+        self.validate()
+
+    def validate(self):
+        for col in ('month_probabilities', 'hour_probabilities'):
+            sums = getattr(self, col).sum(axis=1)
+            if not np.all((0.999 <= sums) & (sums <= 1.001)):
+                raise ValueError(f"The sum of {col} must be 1 for every store. Got {sums[(sums < 0.999) | (sums > 1.001)][0]}.")
+        if self.apportionment not in APPORTIONMENT_METHODS:
+            raise ValueError(f"Invalid apportionment method. Choose from {', '.join(APPORTIONMENT_METHODS)}. Got {self.apportionment}.")
+
+    @property
+    def store_count(self) -> int:
+        return len(self.total_orders)
+
+    def level(self, distribution_type: str) -> pl.DataFrame:
+        if distribution_type not in DISTRIBUTION_TYPES:
+            raise ValueError("Invalid distribution type. Choose from 'year', 'month', 'day', 'hour'.")
+        return getattr(self, f"{distribution_type}s")
+
+    def apply_noise(self, probabilities: np.ndarray) -> np.ndarray:
+        if self.noise_std_dev is not None:
+            with profile_stage(self.profiler, 'noise') as stage:
+                # heavy noise would otherwise turn probabilities negative
+                probabilities = probabilities * np.maximum(self.rng.normal(1, self.noise_std_dev, probabilities.shape), 0.0)
+                totals = probabilities.sum(axis=1, keepdims=True)
+                probabilities = np.divide(probabilities, totals, out=np.full(probabilities.shape, 1.0 / probabilities.shape[1]), where=totals > 0)
+                stage.rows = probabilities.size
+        return probabilities
+
+    def apply_markov(self, level: str, probabilities: np.ndarray) -> np.ndarray:
+        if self.markov is not None and self.markov.level == level:
+            # regime paths draw until the slowest row is done, per-row streams keep that away from the later levels
+            rng = self.rng.spawn() if isinstance(self.rng, RowStreams) else self.rng
+            probabilities = probabilities * self.markov.simulate(probabilities.shape[1], self.store_count, rng)
+        return probabilities
+
+    def apply_trend(self, probabilities: np.ndarray) -> np.ndarray:
+        count = probabilities.shape[1]
+        if count > 1:
+            probabilities = probabilities * (1 + self.linear_trend[:, None] * (np.arange(count) / (count - 1)))
+        return probabilities
+
+    def probabilities(self, distribution_type: str) -> np.ndarray:
+        return getattr(self, f"{distribution_type}_probability_matrix")
+
+    def counts(self, distribution_type: str) -> np.ndarray:
+        return getattr(self, f"{distribution_type}_counts")
+
+    def apportion_level(self, periods: Periods, parent_totals: np.ndarray, probabilities: np.ndarray) -> np.ndarray:
+        # every store is one block of segments, shifted by the store's period count
+        with profile_stage(self.profiler, 'apportionment') as stage:
+            stores = np.arange(self.store_count)[:, None]
+            offsets = np.append((stores * len(periods) + periods.offsets[:-1]).ravel(), self.store_count * len(periods))
+            total_orders = apportion((parent_totals[:, periods.parent_index] * probabilities).ravel(), offsets, 
+                                     parent_totals.ravel(), self.apportionment, self.rng)
+            stage.rows = len(total_orders)
+        return total_orders.reshape(self.store_count, len(periods))
+
+    def build_level(self, distribution_type: str, parent_type: Optional[str], time_cols: List[str]) -> pl.DataFrame:
+        periods = getattr(self.generator, distribution_type)
+        probabilities = self.probabilities(distribution_type)
+        total_orders = self.counts(distribution_type)
+        parent = self.level(parent_type) if parent_type else pl.DataFrame({"store_id": self.store_ids})
+        stores = np.arange(self.store_count)[:, None]
+        parent = parent[(stores * (len(parent) // self.store_count) + periods.parent_index).ravel()].drop("total_orders", strict=False)
+
+        with profile_stage(self.profiler, 'assembly') as stage:
+            level = parent.with_columns(
+                *[pl.Series(col, np.tile(getattr(periods, col), self.store_count)) for col in time_cols],
+                pl.Series(f"{distribution_type}_probability", probabilities.ravel()),
+                pl.Series("total_orders", total_orders.ravel())
+            )
+
+            columns = [col for col in level.columns if not col.endswith("_probability") and col != "total_orders"]
+            columns += [col for col in level.columns if col.endswith("_probability")]
+            stage.rows = len(level)
+            return level.select(columns + ["total_orders"])
+
+    @cached_property
+    def year_probability_matrix(self) -> np.ndarray:
+        periods = self.generator.year
+        with profile_stage(self.profiler, 'probabilities') as stage:
+            probabilities = self.apply_trend(np.tile(periods.days / periods.days.sum(), (self.store_count, 1)))
+            probabilities = periods.normalize(self.apply_noise(periods.normalize(probabilities)))
+            stage.rows = probabilities.size
+        return probabilities
+
+    @cached_property
+    def month_probability_matrix(self) -> np.ndarray:
+        periods = self.generator.month
+        with profile_stage(self.profiler, 'probabilities') as stage:
+            first_of_month = periods.start.astype('datetime64[M]')
+            full_month_days = ((first_of_month + 1).astype('datetime64[D]') - first_of_month.astype('datetime64[D]')).astype(int)
+
+            probabilities = self.month_probabilities[:, periods.month - 1] * (periods.days / full_month_days)
+            probabilities = periods.normalize(self.apply_noise(self.apply_trend(probabilities)))
+            stage.rows = probabilities.size
+        return probabilities
+
+    @cached_property
+    def day_probability_matrix(self) -> np.ndarray:
+        periods = self.generator.day
+        with profile_stage(self.profiler, 'probabilities') as stage:
+            probabilities = self.apply_noise(np.full((self.store_count, len(periods)), 1.0 / len(periods)))
+            probabilities = (probabilities
+                             * self.day_of_month_factor[:, periods.day_of_month - 1]
+                             * self.day_of_week_factor[:, periods.day_of_week])
+            probabilities = periods.normalize(self.apply_markov('day', probabilities))
+            stage.rows = probabilities.size
+        return probabilities
+
+    @cached_property
+    def hour_probability_matrix(self) -> np.ndarray:
+        periods = self.generator.hour
+        with profile_stage(self.profiler, 'probabilities') as stage:
+            profile = self.apply_noise(self.hour_probabilities)
+            probabilities = periods.normalize(self.apply_markov('hour', profile[:, periods.hour_in_day]))
+            stage.rows = probabilities.size
+        return probabilities
+
+    @cached_property
+    def year_counts(self) -> np.ndarray:
+        probabilities = self.year_probability_matrix
+        return self.apportion_level(self.generator.year, self.total_orders[:, None], probabilities)
+
+    @cached_property
+    def month_counts(self) -> np.ndarray:
+        probabilities = self.month_probability_matrix
+        return self.apportion_level(self.generator.month, self.year_counts, probabilities)
+
+    @cached_property
+    def day_counts(self) -> np.ndarray:
+        probabilities = self.day_probability_matrix
+        return self.apportion_level(self.generator.day, self.month_counts, probabilities)
+
+    @cached_property
+    def hour_counts(self) -> np.ndarray:
+        probabilities = self.hour_probability_matrix
+        return self.apportion_level(self.generator.hour, self.day_counts, probabilities)
+
+    @cached_property
+    def years(self) -> pl.DataFrame:
+        return self.build_level('year', None, ["year"])
+
+    @cached_property
+    def months(self) -> pl.DataFrame:
+        return self.build_level('month', 'year', ["month"])
+
+    @cached_property
+    def days(self) -> pl.DataFrame:
+        return self.build_level('day', 'month', ["day_of_month", "day_of_week"])
+
+    @cached_property
+    def hours(self) -> pl.DataFrame:
+        return self.build_level('hour', 'day', ["hour_in_day"])
@@ -0,0 +1,60 @@
+import polars as pl
+
+from typing import List, Optional
+
+SUMMARY_DIMENSIONS = {'year': 'year', 'month': 'month', 'day_of_week': 'day_of_week', 'hour': 'hour_in_day'}
+SUMMARY_FORMATS = ('csv', 'markdown')
+PROBABILITY_COLS = ('year_probability', 'month_probability', 'day_probability', 'hour_probability')
+
+def summarize(distribution: pl.DataFrame, profile: Optional[pl.DataFrame] = None) -> pl.DataFrame:
+    # the profile is the same level without noise or Markov shocks, its probabilities are the configured targets
+    profile = profile if profile is not None else distribution
+    probability_cols = [col for col in PROBABILITY_COLS if col in profile.columns]
+    total_orders = distribution['total_orders'].sum()
+
+    # the product of the level probabilities is each period's share of the run before apportionment,
+    # with several stores it is a share of the store, weighted by the store's part of the run
+    target_share = pl.fold(pl.lit(1.0), lambda acc, col: acc * col, [pl.col(col) for col in probability_cols])
+    if 'store_id' in profile.columns:
+        store_weight = pl.col('total_orders').sum().over('store_id') / total_orders if total_orders else pl.lit(0.0)
+        target_share = target_share / target_share.sum().over('store_id') * store_weight
+    periods = distribution.with_columns(profile.select(target_share.alias('target_share'))['target_share']).with_columns(
+        pl.col('target_share') / pl.col('target_share').sum()
+    )
+
+    summaries = []
+    for dimension, col in SUMMARY_DIMENSIONS.items():
+        if col not in periods.columns:
+            continue
+        summaries.append(
+            periods.group_by(col)
+            .agg(pl.col('total_orders').sum(), pl.col('target_share').sum())
+            .sort(col)
+            .select(pl.lit(dimension).alias('dimension'), pl.col(col).cast(pl.Int64).alias('value'),
+                    pl.col('total_orders').cast(pl.Int64), pl.col('target_share'))
+        )
+
+    return pl.concat(summaries).with_columns(
+        (pl.col('total_orders') / total_orders if total_orders else pl.lit(0.0)).alias('share')
+    ).with_columns(
+        (pl.col('share') - pl.col('target_share')).alias('error')
+    ).select(['dimension', 'value', 'total_orders', 'share', 'target_share', 'error'])
+
+def markdown_lines(summary: pl.DataFrame) -> List[str]:
+    lines = ["| " + " | ".join(summary.columns) + " |", "|" + "---|" * len(summary.columns)]
+    rows = summary.select(pl.concat_str(
+        [pl.lit("| "), pl.col('dimension'), pl.lit(" | "), pl.col('value').cast(pl.String), pl.lit(" | "),
+         pl.col('total_orders').cast(pl.String), pl.lit(" | "),
+         pl.col('share').round(6).cast(pl.String), pl.lit(" | "), pl.col('target_share').round(6).cast(pl.String), 
+         pl.lit(" | "), pl.col('error').round(6).cast(pl.String), pl.lit(" |")]
+    ))
+    return lines + rows.to_series().to_list()
+
+def write_summary(summary: pl.DataFrame, path: str, file_format: str = 'csv'):
+    if file_format == 'csv':
+        summary.write_csv(path)
+    elif file_format == 'markdown':
+        with open(path, "w") as file:
+            file.write("\n".join(markdown_lines(summary)) + "\n")
+    else:
+        raise ValueError(f"Invalid summary format. Choose from {', '.join(SUMMARY_FORMATS)}. Got {file_format}.")
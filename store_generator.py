@@ -0,0 +1,77 @@
+from periods.noiser import derive_rng
+from periods.intrahour import validate_minute_probabilities
+from periods.markov import MarkovProcess
+from periods.cache import cache_key
+from periods.profiling import Profiler
+from periods.stores import StoreDistributionPipeline
+from order_generator import OrderDistributionGenerator
+
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+import polars as pl
+
+class MultiStoreOrderGenerator(OrderDistributionGenerator):
+    ID_COLS = ['store_id']
+
+    def __init__(self, start_date: datetime, end_date: datetime, stores: pl.DataFrame, 
+                 noise_std_dev: Optional[float] = None,
+                 seed: Optional[int] = None,
+                 apportionment: str = 'largest_remainder',
+                 minute_probabilities: Optional[List[float]] = None,
+                 markov: Optional[MarkovProcess] = None,
+                 profiler: Optional[Profiler] = None):
+
+        self.start_date = start_date
+        self.end_date = end_date
+        self.stores = stores
+        # the calendar profiles and trend live per store in the stores table
+        self.month_probabilities = None
+        self.day_of_week_factor = None
+        self.day_of_month_factor = None
+        self.hour_probabilities = None
+        self.linear_trend = 0.0
+        self.minute_probabilities = minute_probabilities if minute_probabilities else [1.0 / 60] * 60
+        validate_minute_probabilities(self.minute_probabilities)
+        self.noise_std_dev = noise_std_dev
+        self.seed = seed
+        self.apportionment = apportionment
+        self.markov = markov
+        self.profiler = profiler
+        self.cache = None
+        self.extension = 0
+        self.order_id_offset = 0
+        self.day_weights = None
+        self.pipeline = self.build_pipeline()
+        self.total_orders = int(self.pipeline.total_orders.sum())
+
+    def build_pipeline(self) -> StoreDistributionPipeline:
+        return StoreDistributionPipeline(self.start_date, self.end_date, self.stores, 
+                                         self.noise_std_dev, derive_rng(self.seed, (0,)), 
+                                         self.apportionment, self.profiler, self.markov)
+
+    def get_distribution_frame(self, distribution_type: str) -> pl.DataFrame:
+        level = self.pipeline.level('hour' if distribution_type == 'timestamp' else distribution_type)
+        # the pipeline is store-major, interleave the stores per period so orders come out in time order
+        return level[np.arange(len(level)).reshape(self.pipeline.store_count, -1).T.ravel()]
+
+    @property
+    def cache_key(self) -> str:
+        return cache_key({
+            'start_date': self.start_date, 'end_date': self.end_date, 'stores': self.stores.rows(),
+            'store_columns': self.stores.columns, 'noise_std_dev': self.noise_std_dev, 'seed': self.seed,
+            'apportionment': self.apportionment, 'markov': self.markov.model_dump() if self.markov else None,
+        })
+
+    def save_state(self, path: str, distribution_type: str):
+        raise ValueError("Resumable runs are not supported for multiple stores, generate the full range with MultiStoreOrderGenerator.")
+
+    @classmethod
+    def resume(cls, path: str, end_date: datetime, total_orders: Optional[int] = None, **kwargs):
+        raise ValueError("Resumable runs are not supported for multiple stores, generate the full range with MultiStoreOrderGenerator.")
+
+    def simulate_scenarios(self, distribution_type: str, scenarios: int, 
+                           quantiles: Optional[List[float]] = (0.05, 0.5, 0.95),
+                           batch_size: int = 1000):
+        raise ValueError("Monte Carlo scenarios are not supported for multiple stores, use OrderDistributionGenerator per store.")